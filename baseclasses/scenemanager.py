@@ -1,10 +1,19 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Optional
+import time
 import pygame
 
 from utilities.decorators import singleton
 from utilities.typehints import ActionBuffer, MouseBuffer, InputBuffer
+from utilities.frametimer import FRAME_BUDGET, FrameTimer
+from config.input import InputState, Action
+from config.settings import (
+    DIRTY_RECTS,
+    FRAME_BUDGET_MODE,
+    UPDATE_RATE,
+    MAX_UPDATES,
+)
 
 
 class Scene(ABC):
@@ -22,15 +31,47 @@ class Scene(ABC):
     @abstractmethod
     def render(self, surface: pygame.Surface) -> None: ...
 
+    # Called once every frame whatever the number of fixed updates, for work
+    # that is paced by frames rather than simulated time
+    def update_frame(self, dt: float) -> None:
+        pass
+
+    # Called before rendering with how far between the last update and the next
+    # the frame is, so movement can be drawn smoothly between updates
+    def interpolate(self, alpha: float) -> None:
+        pass
+
+    # Nothing is moving, so frames can be skipped until there is input
+    def is_idle(self) -> bool:
+        return False
+
+    # Screen areas that changed since the last frame, None when everything may
+    # have. Only used when rendering with dirty rectangles
+    def get_dirty_rects(self) -> Optional[list[pygame.Rect]]:
+        return None
+
+    # Called once the next scene has been built, so assets both scenes use stay
+    # loaded across the switch
+    def exit(self) -> None:
+        pass
+
 
 @singleton
 class SceneManager:
     switched = False  # To ensure scene does not switch mid game loop
 
     def __init__(self, starting_scene: Scene) -> None:
+        # Times every phase of every scene, Core records the phases around them
+        self.frame_timer = FrameTimer()
+        # Rectangles of the screen to update, None to update all of it
+        self.dirty_rects = None
+        self.redraw = True
+        # Time not yet simulated, always less than one update
+        self.accumulator = 0.0
         self.switch_scene(starting_scene)
 
     def switch_scene(self, new_scene: Optional[Scene]) -> None:
+        old_scene = getattr(self, "scene", None)
         if new_scene is None:
             self.scene = None
             print("Closing Program")
@@ -38,18 +79,77 @@ class SceneManager:
             self.scene = new_scene(self)
             print(f"Switched to {new_scene.__name__} Scene")
         self.switched = True
+        self.redraw = True
+
+        if old_scene is not None:
+            old_scene.exit()
 
     def handle_input(self, input_buffer: InputBuffer) -> None:
-        if self.switched:
-            return
-        self.scene.handle_input(*input_buffer)
+        start_time = time.perf_counter()
+        if input_buffer[0][Action.PROFILE][InputState.PRESSED]:
+            self.frame_timer.toggle()
+            self.redraw = True
+
+        if not self.switched:
+            self.scene.handle_input(*input_buffer)
+        self.frame_timer.record("input", time.perf_counter() - start_time)
 
+    # Runs as many fixed updates as the time since the last frame covers
     def update(self, dt: float) -> None:
-        if self.switched:
-            return
-        self.scene.update(dt)
+        start_time = time.perf_counter()
+        if not self.switched:
+            self.scene.update_frame(dt)
+
+        step = 1 / UPDATE_RATE
+        self.accumulator = min(self.accumulator + dt, step * MAX_UPDATES)
+        while self.accumulator >= step:
+            if not self.switched:
+                self.scene.update(step)
+            self.accumulator -= step
+        self.frame_timer.record("update", time.perf_counter() - start_time)
+
+    # A scene that was just switched to always gets to draw itself first
+    def is_idle(self) -> bool:
+        return not self.switched and self.scene.is_idle()
+
+    # Whether the work of the last frame, not counting waiting for vsync, took
+    # longer than a frame so scenes should leave out what they can
+    def is_over_budget(self) -> bool:
+        if not FRAME_BUDGET_MODE:
+            return False
+        work = self.frame_timer.get_last_frame_time(
+            ("events", "input", "update", "render")
+        )
+        return work > FRAME_BUDGET
 
     def render(self, surface: pygame.Surface) -> None:
-        if self.switched:
+        start_time = time.perf_counter()
+        self.dirty_rects = None
+        if not self.switched:
+            self.scene.interpolate(self.accumulator * UPDATE_RATE)
+            if DIRTY_RECTS:
+                self.render_dirty(surface)
+            else:
+                self.scene.render(surface)
+                self.frame_timer.render(surface)
+        self.frame_timer.record("render", time.perf_counter() - start_time)
+
+    # Redraws only the bounding box of what changed, and nothing at all when
+    # the scene is idle
+    def render_dirty(self, surface: pygame.Surface) -> None:
+        rects = self.scene.get_dirty_rects()
+        if rects is None or self.redraw:
+            self.scene.render(surface)
+            self.frame_timer.render(surface)
+            self.redraw = False
             return
-        self.scene.render(surface)
+
+        if self.frame_timer.visible:
+            rects.append(self.frame_timer.get_rect())
+
+        if rects:
+            surface.set_clip(rects[0].unionall(rects[1:]))
+            self.scene.render(surface)
+            self.frame_timer.render(surface)
+            surface.set_clip(None)
+        self.dirty_rects = rects
@@ -0,0 +1,261 @@
+# Headless benchmarks of rendering, grid lookups and placement on large boards
+# Example: python benchmark.py --sizes 100 1000 10000 --output results.json
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from typing import Callable
+
+import pygame
+
+from config.settings import WINDOW_SIZE, WINDOW_WIDTH, WINDOW_HEIGHT
+from components.engine import GameEngine
+from components.hexagonalgrid import (
+    HexPosition,
+    generate_hex_art,
+    get_neighbour_positions,
+    hex_to_world,
+    key_to_position,
+)
+from components.hexrenderer import render_hex
+from components.hintengine import HintEngine
+from scenes.game import Game
+
+
+SIZES = (100, 1000, 10000, 100000)
+FRAMES = 120
+LOOKUPS = 1000
+SAMPLES = 50
+PLACEMENTS = 200
+PAN_SPEED = 12  # Pixels per frame, about as fast as a chunk can be crossed
+
+
+# Fills rings around the origin in order, the densest board for its size
+def spiral_positions(engine: GameEngine, size: int) -> Callable[[], HexPosition]:
+    positions = []
+    ring = [HexPosition(0, 0, 0)]
+    visited = {HexPosition(0, 0, 0)}
+    while len(positions) < size:
+        next_ring = []
+        for position in ring:
+            for adj in get_neighbour_positions(position):
+                if adj not in visited:
+                    visited.add(adj)
+                    next_ring.append(adj)
+        # Sorting by angle keeps each ring walking around the origin
+        next_ring.sort(key=lambda p: math.atan2(*reversed(hex_to_world(p))))
+        positions.extend(next_ring)
+        ring = next_ring
+
+    iterator = iter(positions)
+    return lambda: next(iterator)
+
+
+# Grows outwards from random open cells, a stringier board with more open cells
+def random_positions(engine: GameEngine, size: int) -> Callable[[], HexPosition]:
+    candidates = []
+
+    def pick() -> HexPosition:
+        while True:
+            if not candidates:
+                candidates.extend(engine.grid.open)
+                random.shuffle(candidates)
+            key = candidates.pop()
+            if key in engine.grid.open:
+                return key_to_position(key)
+
+    return pick
+
+
+FILLS = {"spiral": spiral_positions, "random": random_positions}
+
+
+def fill_board(engine: GameEngine, size: int, fill: str) -> None:
+    pick = FILLS[fill](engine, size)
+    engine.tile_manager.add_to_remaining(size)
+    while len(engine.grid.grid) < size:
+        engine.place(pick(), random.randrange(6))
+
+
+# Stands in for the scene manager, every frame is timed in full so nothing is
+# left out for running over budget
+class BenchmarkSceneManager:
+    def is_over_budget(self) -> bool:
+        return False
+
+
+def build_game(size: int, fill: str) -> Game:
+    game = Game(BenchmarkSceneManager())
+    fill_board(game.engine, size, fill)
+    for tile in game.hex_grid.get_placed_tiles():
+        tile.sector_sprites = generate_hex_art(tile.sides, game.BIOME_SPRITE_MAP)
+    game.hint_engine = HintEngine(game.hex_grid)
+    return game
+
+
+# Seconds per call of each sample, where a sample calls the function count times
+# after an untimed call of setup
+def sample(
+    function: Callable[[], object],
+    samples: int,
+    count: int = 1,
+    setup: Callable[[], object] = lambda: None,
+) -> dict:
+    times = []
+    for _ in range(samples):
+        setup()
+        start_time = time.perf_counter()
+        for _ in range(count):
+            function()
+        times.append((time.perf_counter() - start_time) / count)
+    times.sort()
+    return {
+        "mean_us": round(sum(times) / len(times) * 1e6, 3),
+        "p50_us": round(times[len(times) // 2] * 1e6, 3),
+        "p95_us": round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1e6, 3),
+    }
+
+
+def benchmark_size(size: int, fill: str, window: pygame.Surface) -> dict:
+    random.seed(f"{fill}-{size}")
+    start_time = time.perf_counter()
+    game = build_game(size, fill)
+    build_time = time.perf_counter() - start_time
+
+    grid = game.hex_grid
+    keys = list(grid.grid)
+    open_keys = list(grid.open)
+    results = {
+        "tiles": len(grid.grid),
+        "open": len(open_keys),
+        "build_s": round(build_time, 3),
+    }
+
+    # Camera held still, so cached chunk surfaces are reused
+    game.camera.x, game.camera.y = 0, 0
+    game.render(window)
+    results["render_static"] = sample(lambda: game.render(window), FRAMES)
+
+    # Camera sweeping away from the origin, so chunks are baked as they come in
+    def render_panning() -> None:
+        game.camera.x += PAN_SPEED
+        game.camera.y += PAN_SPEED // 2
+        game.render(window)
+
+    results["render_panning"] = sample(render_panning, FRAMES)
+
+    # Camera jumping around the board, the worst case for the chunk cache
+    jumps = iter(
+        [hex_to_world(key_to_position(random.choice(keys))) for _ in range(FRAMES)]
+    )
+
+    def render_jumping() -> None:
+        game.camera.x, game.camera.y = (int(v) for v in next(jumps))
+        game.render(window)
+
+    results["render_jumping"] = sample(render_jumping, FRAMES)
+
+    game.camera.x, game.camera.y = 0, 0
+    visible, _ = grid.query_visible(game.camera, WINDOW_WIDTH, WINDOW_HEIGHT)
+    results["render_hex"] = sample(
+        lambda: [
+            render_hex(window, game.camera, tile, game.BIOME_SPRITES)
+            for tile in visible
+        ],
+        SAMPLES,
+    )
+    results["render_hex"]["tiles"] = len(visible)
+
+    lookup_positions = [key_to_position(random.choice(keys)) for _ in range(LOOKUPS)]
+    open_positions = [key_to_position(random.choice(open_keys)) for _ in range(LOOKUPS)]
+    active = game.tile_manager.get_active()
+    results["get_tile"] = sample(
+        lambda: [grid.get_tile(p) for p in lookup_positions], SAMPLES
+    )
+    results["get_facing_pattern"] = sample(
+        lambda: [grid.get_facing_pattern(p) for p in open_positions], SAMPLES
+    )
+    results["query_visible"] = sample(
+        lambda: grid.query_visible(game.camera, WINDOW_WIDTH, WINDOW_HEIGHT), SAMPLES
+    )
+    results["find_fits"] = sample(lambda: grid.find_fits(active), SAMPLES)
+    # Hints are cached until the board changes, so this is the uncached cost
+    results["get_hints"] = sample(lambda: game.hint_engine.get_hints(active, None), 1)
+    for name in ("get_tile", "get_facing_pattern"):
+        for stat in ("mean_us", "p50_us", "p95_us"):
+            results[name][stat] = round(results[name][stat] / LOOKUPS, 3)
+
+    # Placing through the game and drawing the next frame, so scoring, hints,
+    # art and re-baking the touched chunks are all included. The camera is
+    # moved over each cell and drawn first, so chunks that just came into view
+    # are not counted. Compare against render_static for the frame itself
+    pick = random_positions(game.engine, 0)
+    game.tile_manager.add_to_remaining(PLACEMENTS)
+    placing = []
+
+    def look_at_next() -> None:
+        placing[:] = [pick()]
+        game.camera.x, game.camera.y = (int(v) for v in hex_to_world(placing[0]))
+        game.render(window)
+
+    def place() -> None:
+        for event in game.engine.place(placing[0], random.randrange(6)):
+            game.handle_score_event(event)
+        game.render(window)
+
+    results["place"] = sample(place, PLACEMENTS, setup=look_at_next)
+    return results
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark HEXAGOD headless")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--fill", choices=tuple(FILLS), default="spiral")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    pygame.init()
+    window = pygame.display.set_mode(WINDOW_SIZE)
+
+    report = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "fill": args.fill,
+        "sizes": {},
+    }
+    for size in args.sizes:
+        results = benchmark_size(size, args.fill, window)
+        report["sizes"][size] = results
+        print(f"{size} tiles ({results['open']} open, built in {results['build_s']}s)")
+        for name, stats in results.items():
+            if isinstance(stats, dict):
+                print(f"  {name:<20} mean={stats['mean_us']}us p95={stats['p95_us']}us")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,22 @@
-from typing import Hashable
+from typing import Callable, Hashable
 import pygame
 
 
+# Frame sequences are built once per process and shared by every player using
+# them. Players never modify their frames so the lists can be shared safely
+ANIMATION_FRAMES = {}
+
+
+def get_frames(
+    unique_identifier: Hashable, build: Callable[[], list[pygame.Surface]]
+) -> list[pygame.Surface]:
+    frames = ANIMATION_FRAMES.get(unique_identifier)
+    if frames is None:
+        frames = build()
+        ANIMATION_FRAMES[unique_identifier] = frames
+    return frames
+
+
 class AnimationPlayer:
     def __init__(
         self,
@@ -29,6 +44,9 @@ class AnimationPlayer:
     def get_frame(self) -> pygame.Surface:
         return self.frames[self.frame_index]
 
+    def is_finished(self) -> bool:
+        return not self.loop and self.frame_index == len(self.frames) - 1
+
     def reset(self) -> None:
         self.frame_index = 0
         self.elasped_time = 0.0
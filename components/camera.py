@@ -3,19 +3,43 @@ MAX_MOVE_SPEED = 160
 
 class Camera:
     def __init__(self, x: float, y: float, offset_x: int, offset_y: int) -> None:
+        # Drawn at x, y, which is between where the last two updates left it
         self.x = x
         self.y = y
+        self.position = (x, y)
+        self.previous_position = (x, y)
         self.offset_x = offset_x
         self.offset_y = offset_y
 
-    def move(self, dt: float, dx: int, dy: int) -> None:
-        self.x += dx * MAX_MOVE_SPEED * dt
-        self.y += dy * MAX_MOVE_SPEED * dt
-        self.x = int(self.x)
-        self.y = int(self.y)
+    # Jumps straight there instead of sliding over from the last position
+    def set_position(self, x: float, y: float) -> None:
+        self.position = (x, y)
+        self.previous_position = (x, y)
+        self.x = round(x)
+        self.y = round(y)
+
+    def move(self, dt: float, dx: float, dy: float) -> None:
+        self.previous_position = self.position
+        x, y = self.position
+        self.position = (x + dx * MAX_MOVE_SPEED * dt, y + dy * MAX_MOVE_SPEED * dt)
+
+    # Alpha is how far through the next update the frame is drawn. Whole pixels
+    # keep chunks and tiles drawn on their own lined up
+    def interpolate(self, alpha: float) -> None:
+        (previous_x, previous_y), (x, y) = self.previous_position, self.position
+        self.x = round(previous_x + (x - previous_x) * alpha)
+        self.y = round(previous_y + (y - previous_y) * alpha)
 
     def world_to_screen(self, x: float, y: float) -> tuple[int, int]:
         return int(x - self.x + self.offset_x), int(y - self.y + self.offset_y)
 
+    # Offset is worked out once for the whole batch instead of once per point
+    def world_to_screen_points(
+        self, points: list[tuple[float, float]]
+    ) -> list[tuple[int, int]]:
+        dx = self.offset_x - self.x
+        dy = self.offset_y - self.y
+        return [(int(x + dx), int(y + dy)) for x, y in points]
+
     def screen_to_world(self, x: float, y: float) -> tuple[float, float]:
         return x - self.offset_x + self.x, y - self.offset_y + self.y
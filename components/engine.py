@@ -0,0 +1,123 @@
+from __future__ import annotations
+from typing import Optional
+from enum import Enum, auto
+from dataclasses import dataclass
+
+from components.hexagonalgrid import (
+    SIDE_MASK,
+    SIDE_SHIFTS,
+    OPPOSITE_SIDE_SHIFTS,
+    HexPosition,
+    HexTile,
+    HexagonalGrid,
+    encode_sides,
+)
+from components.tilemanager import TileManager, STARTING_BIOME
+
+
+# This script holds the placement rules and must not depend on pygame so games
+# can be simulated headless
+
+
+PREVIEW_LENGTH = 6
+STARTING_TILES = 50
+
+EDGE_SCORE = 10
+PERFECT_SCORE = 100
+PERFECT_BONUS_TILES = 3
+
+
+class ScoreEventType(Enum):
+    PLACE = auto()
+    EDGE_MATCH = auto()
+    PERFECT = auto()
+    HOLD = auto()
+    ROTATE = auto()
+
+
+@dataclass
+class ScoreEvent:
+    type: ScoreEventType
+    position: Optional[HexPosition] = None
+    side: Optional[int] = None  # Side of the placed tile the event happened on
+    points: int = 0
+
+
+class GameEngine:
+    def __init__(
+        self,
+        preview_length: int = PREVIEW_LENGTH,
+        remaining_tiles: int = STARTING_TILES,
+    ) -> None:
+        self.grid = HexagonalGrid()
+        self.grid.add_tile(
+            HexTile(HexPosition(0, 0, 0), encode_sides([STARTING_BIOME] * 6), 0, None)
+        )
+
+        self.tile_manager = TileManager(preview_length, remaining_tiles)
+        self.score = 0
+        self.placed = 1
+        self.perfects = 0
+
+    def is_game_over(self) -> bool:
+        return (
+            self.tile_manager.get_remaining() == 0
+            and self.tile_manager.get_active() is None
+        )
+
+    def hold(self) -> list[ScoreEvent]:
+        self.tile_manager.swap_held_tile()
+        return [ScoreEvent(ScoreEventType.HOLD)]
+
+    def rotate(self) -> list[ScoreEvent]:
+        self.tile_manager.rotate_active_tile()
+        return [ScoreEvent(ScoreEventType.ROTATE)]
+
+    def place(self, position: HexPosition, rotation: int = 0) -> list[ScoreEvent]:
+        if not self.grid.is_open(position) or self.tile_manager.get_active() is None:
+            return []
+
+        for _ in range(rotation % 6):
+            self.tile_manager.rotate_active_tile()
+
+        tile = self.tile_manager.create_active_tile(position)
+        self.grid.add_tile(tile)
+        self.placed += 1
+        events = [ScoreEvent(ScoreEventType.PLACE, position)]
+
+        adj_tiles = self.grid.get_neighbour_tiles(position)
+        for i, adj_tile in enumerate(adj_tiles):
+            if adj_tile is None:
+                continue
+
+            side = (tile.sides >> SIDE_SHIFTS[i]) & SIDE_MASK
+            facing = (adj_tile.sides >> OPPOSITE_SIDE_SHIFTS[i]) & SIDE_MASK
+            tile.sides_touching |= facing << SIDE_SHIFTS[i]
+            adj_tile.sides_touching |= side << OPPOSITE_SIDE_SHIFTS[i]
+
+            # If same biomes are touching
+            if side == facing:
+                self.score += EDGE_SCORE
+                tile.matching_sides += 1
+                adj_tile.matching_sides += 1
+                events.append(
+                    ScoreEvent(ScoreEventType.EDGE_MATCH, position, i, EDGE_SCORE)
+                )
+
+                if adj_tile.matching_sides == 6:
+                    events.append(self.complete_perfect(adj_tile, i))
+            else:
+                tile.can_be_perfect = False
+                adj_tile.can_be_perfect = False
+
+        if tile.matching_sides == 6:
+            events.append(self.complete_perfect(tile, None))
+
+        self.tile_manager.get_next_tile()
+        return events
+
+    def complete_perfect(self, tile: HexTile, side: Optional[int]) -> ScoreEvent:
+        self.score += PERFECT_SCORE
+        self.perfects += 1
+        self.tile_manager.add_to_remaining(PERFECT_BONUS_TILES)
+        return ScoreEvent(ScoreEventType.PERFECT, tile.position, side, PERFECT_SCORE)
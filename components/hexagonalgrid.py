@@ -2,13 +2,11 @@ from __future__ import annotations
 from typing import Optional
 import math
 from enum import Enum, auto
-from dataclasses import dataclass, astuple
+from dataclasses import dataclass
 import random
-import pygame
 
 from components.camera import Camera
 
-
 # This script uses flat-top oriented hexagons and a cube coordinate system
 # https://www.redblobgames.com/grids/hexagons/
 
@@ -17,10 +15,8 @@ SIZE = 24
 WIDTH = 2 * SIZE
 HEIGHT = math.sqrt(3) * SIZE
 
-OUTLINE_WIDTH = 2
-
-RENDER_OFFSETS_EVEN = ((0, -6), (-5, 1), (5, 1))
-RENDER_OFFSETS_ODD = ((0, 4), (-5, -2), (5, -2))
+# Number of hexes along each axial axis of a spatial index chunk
+CHUNK_SIZE = 16
 
 
 class Biome(Enum):
@@ -32,49 +28,93 @@ class Biome(Enum):
     SNOW = auto()
 
 
-BIOME_COLOUR_MAP = {
-    Biome.SWAMP: (191, 148, 228),
-    Biome.GRASS: (87, 167, 115),
-    Biome.SAND: (255, 225, 86),
-    Biome.FOREST: (11, 83, 81),
-    Biome.MOUNTAIN: (99, 89, 92),
-    Biome.SNOW: (208, 229, 227),
-}
+class SideStates(Enum):
+    UNKNOWN = auto()
+    MATCH = auto()
+    MISSMATCH = auto()
 
-DARK = 25
-BIOME_FAILED_COLOUR_MAP = {
-    Biome.SWAMP: (191 - DARK, 148 - DARK, 228 - DARK),
-    Biome.GRASS: (87 - DARK, 167 - DARK, 115 - DARK),
-    Biome.SAND: (255 - DARK, 225 - DARK, 86 - DARK),
-    Biome.FOREST: (0, 83 - DARK, 81 - DARK),
-    Biome.MOUNTAIN: (99 - DARK, 89 - DARK, 92 - DARK),
-    Biome.SNOW: (208 - DARK, 229 - DARK, 227 - DARK),
-}
 
+# Six sides packed 3 bits each into an int, side i is stored at bit 3 * i and
+# holds the Biome value or 0 when the side is unknown
+HexSides = int
 
-OUTLINE_COLOUR = (50, 30, 50)
-HOVER_COLOUR = (255, 255, 255)
-HIGHLIGHT_COLOUR = (255, 255, 0)
-OPEN_COLOUR = (20, 150, 170)
+SIDE_BITS = 3
+SIDE_MASK = (1 << SIDE_BITS) - 1
+SIDES_MASK = (1 << SIDE_BITS * 6) - 1
+SIDE_LOW_BITS = sum(1 << SIDE_BITS * i for i in range(6))  # Lowest bit of each side
+SIDE_SHIFTS = tuple(SIDE_BITS * i for i in range(6))
+OPPOSITE_SIDE_SHIFTS = tuple(SIDE_BITS * ((i + 3) % 6) for i in range(6))
 
+BIOME_BY_VALUE = (None,) + tuple(Biome)
 
-class SideStates(Enum):
-    UNKNOWN = auto()
-    MATCH = auto()
-    MISSMATCH = auto()
 
+def encode_sides(biomes: list[Optional[Biome]]) -> HexSides:
+    sides = 0
+    for i, biome in enumerate(biomes):
+        if biome is not None:
+            sides |= biome.value << SIDE_SHIFTS[i]
+    return sides
 
-HexSides = tuple[
-    Optional[Biome],
-    Optional[Biome],
-    Optional[Biome],
-    Optional[Biome],
-    Optional[Biome],
-    Optional[Biome],
-]
 
+def decode_sides(sides: HexSides) -> list[Optional[Biome]]:
+    return [BIOME_BY_VALUE[(sides >> shift) & SIDE_MASK] for shift in SIDE_SHIFTS]
 
-@dataclass
+
+def get_side(sides: HexSides, i: int) -> Optional[Biome]:
+    return BIOME_BY_VALUE[(sides >> SIDE_SHIFTS[i]) & SIDE_MASK]
+
+
+# Rotating once moves side i to side i + 1, matching a clockwise spin
+def rotate_sides(sides: HexSides, steps: int = 1) -> HexSides:
+    shift = SIDE_SHIFTS[steps % 6]
+    return ((sides << shift) | (sides >> (SIDE_BITS * 6 - shift))) & SIDES_MASK
+
+
+ROTATION_TABLE = {}
+
+
+def get_rotations(sides: HexSides) -> tuple[HexSides, ...]:
+    rotations = ROTATION_TABLE.get(sides)
+    if rotations is None:
+        rotations = tuple(rotate_sides(sides, steps) for steps in range(6))
+        ROTATION_TABLE[sides] = rotations
+    return rotations
+
+
+# Smallest of the six rotations, equal for every rotation of the same tile
+def get_canonical(sides: HexSides) -> HexSides:
+    return min(get_rotations(sides))
+
+
+# Number of known sides in a facing pattern that the given sides match
+def count_matches(sides: HexSides, pattern: HexSides) -> int:
+    difference = sides ^ pattern
+    mismatched = (difference | difference >> 1 | difference >> 2) & SIDE_LOW_BITS
+    known = (pattern | pattern >> 1 | pattern >> 2) & SIDE_LOW_BITS
+    return (known & ~mismatched).bit_count()
+
+
+# All three bits set on every known side of a facing pattern
+def get_known_mask(pattern: HexSides) -> int:
+    return ((pattern | pattern >> 1 | pattern >> 2) & SIDE_LOW_BITS) * SIDE_MASK
+
+
+def get_side_states(sides: HexSides, pattern: HexSides) -> list[SideStates]:
+    states = [SideStates.UNKNOWN] * 6
+    for i, shift in enumerate(SIDE_SHIFTS):
+        facing = (pattern >> shift) & SIDE_MASK
+        if facing == 0:
+            continue
+
+        # If same biomes are touching
+        if (sides >> shift) & SIDE_MASK == facing:
+            states[i] = SideStates.MATCH
+        else:
+            states[i] = SideStates.MISSMATCH
+    return states
+
+
+@dataclass(frozen=True, slots=True)
 class HexPosition:
     q: int
     r: int
@@ -83,6 +123,10 @@ class HexPosition:
     def __add__(self, other: HexPosition) -> HexPosition:
         return HexPosition(self.q + other.q, self.r + other.r, self.s + other.s)
 
+    # Same value as the packed grid key, cheaper than hashing a field tuple
+    def __hash__(self) -> int:
+        return self.q * KEY_STRIDE + self.r
+
 
 @dataclass
 class HexTile:
@@ -104,53 +148,253 @@ HEXAGONAL_NEIGHBOURS = (
 )
 
 
+# Grid storage is keyed by axial (q, r) packed into one int, s = -q - r is implied.
+# Packing is linear so adding an offset key walks to a neighbour without allocating
+KEY_STRIDE = 1 << 20
+KEY_HALF_STRIDE = KEY_STRIDE // 2
+
+
+def pack_key(q: int, r: int) -> int:
+    return q * KEY_STRIDE + r
+
+
+def unpack_key(key: int) -> tuple[int, int]:
+    q = (key + KEY_HALF_STRIDE) // KEY_STRIDE
+    return q, key - q * KEY_STRIDE
+
+
+def get_key(hex_position: HexPosition) -> int:
+    return hex_position.q * KEY_STRIDE + hex_position.r
+
+
+# Open cells and neighbours are turned back into positions every frame, so the
+# same immutable instance is shared instead of allocating a new one each time
+MAX_INTERNED_POSITIONS = 1 << 16
+INTERNED_POSITIONS = {}
+
+
+def key_to_position(key: int) -> HexPosition:
+    position = INTERNED_POSITIONS.get(key)
+    if position is None:
+        if len(INTERNED_POSITIONS) >= MAX_INTERNED_POSITIONS:
+            INTERNED_POSITIONS.clear()
+        q, r = unpack_key(key)
+        position = HexPosition(q, r, -q - r)
+        INTERNED_POSITIONS[key] = position
+    return position
+
+
+def get_neighbour_positions(hex_position: HexPosition) -> list[HexPosition]:
+    key = get_key(hex_position)
+    return [key_to_position(key + offset) for offset in NEIGHBOUR_KEY_OFFSETS]
+
+
+NEIGHBOUR_KEY_OFFSETS = tuple(get_key(n) for n in HEXAGONAL_NEIGHBOURS)
+
+
 class HexagonalGrid:
     def __init__(self) -> None:
         self.grid = {}
         self.open = set()
+        # Bumped on every change so derived state can be cached against it
+        self.version = 0
+
+        # Spatial index of axial (q, r) buckets for viewport culling
+        self.chunks = {}
+        self.open_chunks = {}
+        # Chunks whose baked surface no longer matches their tiles
+        self.dirty_chunks = set()
+
+        # Facing pattern of every open cell and the inverse index of open cells
+        # sharing each pattern, with a count of cells per known side mask
+        self.patterns = {}
+        self.pattern_cells = {}
+        self.pattern_masks = {}
 
     def write_tile(self, hex: HexTile) -> None:
-        self.grid[astuple(hex.position)] = hex
+        key = get_key(hex.position)
+        self.grid[key] = hex
+        self.chunks.setdefault(get_chunk(key), {})[key] = hex
 
     def get_tile(self, hex_position: HexPosition) -> Optional[HexTile]:
-        return self.grid.get(astuple(hex_position))
+        return self.grid.get(get_key(hex_position))
+
+    def get_neighbour_tiles(self, hex_position: HexPosition) -> list[Optional[HexTile]]:
+        key = get_key(hex_position)
+        return [self.grid.get(key + offset) for offset in NEIGHBOUR_KEY_OFFSETS]
+
+    # Biomes of the neighbouring sides that face each side of an open cell
+    def get_facing_pattern(self, hex_position: HexPosition) -> HexSides:
+        return self.patterns.get(get_key(hex_position), 0)
+
+    def set_pattern(self, key: int, pattern: HexSides) -> None:
+        self.remove_pattern(key)
+        self.patterns[key] = pattern
+        self.pattern_cells.setdefault(pattern, set()).add(key)
+        mask = get_known_mask(pattern)
+        self.pattern_masks[mask] = self.pattern_masks.get(mask, 0) + 1
+
+    def remove_pattern(self, key: int) -> None:
+        pattern = self.patterns.pop(key, None)
+        if pattern is None:
+            return
+
+        cells = self.pattern_cells[pattern]
+        cells.discard(key)
+        if not cells:
+            del self.pattern_cells[pattern]
+
+        mask = get_known_mask(pattern)
+        self.pattern_masks[mask] -= 1
+        if self.pattern_masks[mask] == 0:
+            del self.pattern_masks[mask]
+
+    # Open cells where the tile, in some rotation, matches every known side
+    def find_fits(self, sides: HexSides) -> list[tuple[int, int]]:
+        fits = []
+        for rotation, rotated in enumerate(get_rotations(sides)):
+            for mask in self.pattern_masks:
+                cells = self.pattern_cells.get(rotated & mask)
+                if cells:
+                    fits.extend((key, rotation) for key in cells)
+        return fits
 
     def add_tile(self, hex: HexTile) -> None:
-        self.open.discard(astuple(hex.position))
+        key = get_key(hex.position)
+        self.open.discard(key)
+        open_chunk = self.open_chunks.get(get_chunk(key))
+        if open_chunk is not None:
+            open_chunk.discard(key)
 
-        self.write_tile(hex)
+        self.remove_pattern(key)
 
-        for neighbour in HEXAGONAL_NEIGHBOURS:
-            adj_hex_position = hex.position + neighbour
-            if astuple(adj_hex_position) not in self.grid:
-                self.open.add(astuple(adj_hex_position))
+        self.write_tile(hex)
+        self.version += 1
+        self.dirty_chunks.add(get_chunk(key))
+
+        for i, offset in enumerate(NEIGHBOUR_KEY_OFFSETS):
+            adj_key = key + offset
+            if adj_key not in self.grid:
+                self.open.add(adj_key)
+                self.open_chunks.setdefault(get_chunk(adj_key), set()).add(adj_key)
+
+                # The open neighbour's opposite side now faces this tile
+                facing = (hex.sides >> SIDE_SHIFTS[i]) & SIDE_MASK
+                pattern = self.patterns.get(adj_key, 0)
+                self.set_pattern(adj_key, pattern | facing << OPPOSITE_SIDE_SHIFTS[i])
+            else:
+                # Placed neighbours gain a touching side, which may be across a border
+                self.dirty_chunks.add(get_chunk(adj_key))
 
     def get_placed_tiles(self) -> list[HexTile]:
         return list(self.grid.values())
 
-    def get_open_tiles(self) -> list[HexTile]:
+    def get_open_tiles(self) -> set[int]:
         return self.open
 
     def is_open(self, hex_position: HexPosition) -> bool:
-        return astuple(hex_position) in self.open
+        return get_key(hex_position) in self.open
+
+    def query_visible(
+        self, camera: Camera, width: int, height: int
+    ) -> tuple[list[HexTile], list[int]]:
+        view = get_view_bounds(camera, width, height)
+
+        tiles = []
+        open = []
+        for chunk_key in get_chunks_in_view(*view):
+            chunk = self.chunks.get(chunk_key)
+            if chunk is not None:
+                for key, hex in chunk.items():
+                    if is_in_view(key, *view):
+                        tiles.append(hex)
+
+            open_chunk = self.open_chunks.get(chunk_key)
+            if open_chunk is not None:
+                for key in open_chunk:
+                    if is_in_view(key, *view):
+                        open.append(key)
+
+        return tiles, open
+
+
+def get_chunk(key: int) -> tuple[int, int]:
+    q, r = unpack_key(key)
+    return (q // CHUNK_SIZE, r // CHUNK_SIZE)
+
+
+# World space rectangle containing the centre of every hex that touches the screen
+def get_view_bounds(
+    camera: Camera, width: int, height: int
+) -> tuple[float, float, float, float]:
+    left, top = camera.screen_to_world(-SIZE, -HEIGHT / 2)
+    right, bottom = camera.screen_to_world(width + SIZE, height + HEIGHT / 2)
+    return left, top, right, bottom
+
+
+def get_chunks_in_view(
+    left: float, top: float, right: float, bottom: float
+) -> list[tuple[int, int]]:
+    # Axial bounds of every hex whose centre lies in the view
+    q_min = math.floor(left / (3 / 2 * SIZE))
+    q_max = math.ceil(right / (3 / 2 * SIZE))
+    r_min = math.floor(top / HEIGHT - q_max / 2)
+    r_max = math.ceil(bottom / HEIGHT - q_min / 2)
+
+    return [
+        (cq, cr)
+        for cq in range(q_min // CHUNK_SIZE, q_max // CHUNK_SIZE + 1)
+        for cr in range(r_min // CHUNK_SIZE, r_max // CHUNK_SIZE + 1)
+    ]
+
+
+def is_in_view(key: int, left: float, top: float, right: float, bottom: float) -> bool:
+    q, r = unpack_key(key)
+    x = SIZE * 3 / 2 * q
+    y = HEIGHT * (q / 2 + r)
+    return left <= x <= right and top <= y <= bottom
+
+
+# Corner directions never change, so the trigonometry is done once up front
+CORNER_DIRECTIONS = tuple(
+    (math.cos(math.pi / 180 * (60 * i)), math.sin(math.pi / 180 * (60 * i)))
+    for i in range(6)
+)
+CORNER_OFFSETS = tuple((SIZE * dx, SIZE * dy) for dx, dy in CORNER_DIRECTIONS)
 
 
 def hex_corner(cx: float, cy: float, i: int, size: float = SIZE) -> tuple[float, float]:
-    angle_deg = 60 * i
-    angle_rad = math.pi / 180 * angle_deg
-    return (cx + size * math.cos(angle_rad), cy + size * math.sin(angle_rad))
+    dx, dy = CORNER_DIRECTIONS[i]
+    return (cx + size * dx, cy + size * dy)
 
 
 def get_hex_corners(
     cx: float, cy: float, size: float = SIZE
 ) -> list[tuple[float, float]]:
-    return [hex_corner(cx, cy, i, size) for i in range(6)]
+    if size == SIZE:
+        return [(cx + dx, cy + dy) for dx, dy in CORNER_OFFSETS]
+    return [(cx + size * dx, cy + size * dy) for dx, dy in CORNER_DIRECTIONS]
+
+
+# Tiles are drawn at the same world positions every frame
+MAX_CACHED_WORLD_POSITIONS = 1 << 16
+WORLD_POSITIONS = {}
 
 
 def hex_to_world(hex: HexPosition) -> tuple[float, float]:
-    x = SIZE * (3 / 2 * hex.q)
-    y = SIZE * (math.sqrt(3) / 2 * hex.q + math.sqrt(3) * hex.r)
-    return (x, y)
+    # Fractional positions, like those from world_to_hex, are not cells and
+    # cannot be hashed so are never cached
+    cached = type(hex.q) is int and type(hex.r) is int
+    world = WORLD_POSITIONS.get(hex) if cached else None
+    if world is None:
+        x = SIZE * (3 / 2 * hex.q)
+        y = SIZE * (math.sqrt(3) / 2 * hex.q + math.sqrt(3) * hex.r)
+        world = (x, y)
+        if cached:
+            if len(WORLD_POSITIONS) >= MAX_CACHED_WORLD_POSITIONS:
+                WORLD_POSITIONS.clear()
+            WORLD_POSITIONS[hex] = world
+    return world
 
 
 def world_to_hex(x: int, y: int) -> HexPosition:
@@ -179,108 +423,12 @@ def round_to_nearest_hex(hex: HexPosition) -> HexPosition:
     return HexPosition(q, r, s)
 
 
-def render_hex(
-    surface: pygame.Surface,
-    camera: Camera,
-    hex: HexTile,
-    hex_sprites: list[pygame.Surface],
-) -> None:
-    centre = hex_to_world(hex.position)
-    corners = get_hex_corners(*centre)
-    screen_centre = camera.world_to_screen(*centre)
-    screen_corners = [camera.world_to_screen(*c) for c in corners]
-
-    for i in range(6):
-        colour = (
-            BIOME_COLOUR_MAP[hex.sides[i]]
-            if hex.can_be_perfect
-            else BIOME_FAILED_COLOUR_MAP[hex.sides[i]]
-        )
-        sector = [screen_corners[i - 1], screen_corners[i], screen_centre]
-        pygame.draw.polygon(surface, colour, sector)
-
-        if hex.sector_sprites is None:
-            continue
-
-        middle_x, middle_y = 0, 0
-        for p in sector:
-            middle_x += p[0]
-            middle_y += p[1]
-        middle_x /= len(sector)
-        middle_y /= len(sector)
-
-        for p in range(3):
-            if hex.sector_sprites[i][p] is None:
-                continue
-            offset = RENDER_OFFSETS_EVEN[p] if i % 2 == 0 else RENDER_OFFSETS_ODD[p]
-            surface.blit(
-                hex_sprites[hex.sector_sprites[i][p]],
-                (middle_x - 4 + offset[0], middle_y - 4 + offset[1]),
-            )
-
-    for i in range(6):
-        if hex.sides_touching[i] is not None:
-            continue
-        pygame.draw.line(
-            surface,
-            OUTLINE_COLOUR,
-            screen_corners[i - 1],
-            screen_corners[i],
-            OUTLINE_WIDTH,
-        )
-
-    # for i in range(6):
-    #     pygame.draw.circle(surface, OUTLINE_COLOUR, screen_corners[i], 1)
-
-
-def render_open_hex(
-    surface: pygame.Surface, camera: Camera, hex_position: HexPosition
-) -> None:
-    centre = hex_to_world(hex_position)
-    corners = get_hex_corners(*centre)
-    screen_corners = [camera.world_to_screen(*c) for c in corners]
-
-    pygame.draw.polygon(surface, OPEN_COLOUR, screen_corners)
-
-
-def render_highlighted_hex(
-    surface: pygame.Surface,
-    camera: Camera,
-    hex_position: HexPosition,
-    sides: list[SideStates],
-) -> None:
-    centre = hex_to_world(hex_position)
-    corners = get_hex_corners(*centre)
-    screen_corners = [camera.world_to_screen(*c) for c in corners]
-
-    for i in range(6):
-        if sides[i] == SideStates.MISSMATCH:
-            continue
-        colour = HIGHLIGHT_COLOUR if sides[i] == SideStates.MATCH else HOVER_COLOUR
-        pygame.draw.line(
-            surface, colour, screen_corners[i - 1], screen_corners[i], OUTLINE_WIDTH
-        )
-
-
-def render_preview_hex(
-    surface: pygame.Surface, cx: int, cy: int, sides: HexSides
-) -> None:
-    screen_corners = get_hex_corners(cx, cy)
-
-    for i in range(6):
-        colour = BIOME_COLOUR_MAP[sides[i]]
-        sector = [screen_corners[i - 1], screen_corners[i], (cx, cy)]
-        pygame.draw.polygon(surface, colour, sector)
-
-    pygame.draw.polygon(surface, OUTLINE_COLOUR, screen_corners, OUTLINE_WIDTH)
-
-
 def generate_hex_art(
     hex_sides: HexSides, biome_sprite_map: dict[Biome, list[int]]
 ) -> list[list[Optional[int]]]:
     # Generate art for placed tile
     sector_sprites = []
-    for biome in hex_sides:
+    for biome in decode_sides(hex_sides):
         count = random.randint(1, 3)
         sprites = [None] * 3
         spots = [0, 1, 2]
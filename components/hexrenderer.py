@@ -0,0 +1,319 @@
+import math
+import pygame
+
+from components.camera import Camera
+from components.hexagonalgrid import (
+    SIZE,
+    HEIGHT,
+    CHUNK_SIZE,
+    Biome,
+    SideStates,
+    HexPosition,
+    HexTile,
+    HexSides,
+    HexagonalGrid,
+    get_key,
+    get_side,
+    key_to_position,
+    get_hex_corners,
+    get_view_bounds,
+    get_chunks_in_view,
+    hex_to_world,
+)
+
+OUTLINE_WIDTH = 2
+
+RENDER_OFFSETS_EVEN = ((0, -6), (-5, 1), (5, 1))
+RENDER_OFFSETS_ODD = ((0, 4), (-5, -2), (5, -2))
+
+# Pre-baked tile surfaces are padded so outlines are not clipped at the corners
+BAKE_PADDING = OUTLINE_WIDTH
+BAKE_CENTRE = (SIZE + BAKE_PADDING, math.ceil(HEIGHT / 2) + BAKE_PADDING)
+BAKE_SIZE = (BAKE_CENTRE[0] * 2, BAKE_CENTRE[1] * 2)
+
+# Chunk surfaces cover the bounding box of a CHUNK_SIZE x CHUNK_SIZE parallelogram
+CHUNK_SURFACE_SIZE = (
+    math.ceil(3 / 2 * SIZE * (CHUNK_SIZE - 1)) + BAKE_SIZE[0] + 1,
+    math.ceil(HEIGHT * 3 / 2 * (CHUNK_SIZE - 1)) + BAKE_SIZE[1] + 1,
+)
+MAX_BAKED_CHUNKS = 16
+
+
+BIOME_COLOUR_MAP = {
+    Biome.SWAMP: (191, 148, 228),
+    Biome.GRASS: (87, 167, 115),
+    Biome.SAND: (255, 225, 86),
+    Biome.FOREST: (11, 83, 81),
+    Biome.MOUNTAIN: (99, 89, 92),
+    Biome.SNOW: (208, 229, 227),
+}
+
+DARK = 25
+BIOME_FAILED_COLOUR_MAP = {
+    Biome.SWAMP: (191 - DARK, 148 - DARK, 228 - DARK),
+    Biome.GRASS: (87 - DARK, 167 - DARK, 115 - DARK),
+    Biome.SAND: (255 - DARK, 225 - DARK, 86 - DARK),
+    Biome.FOREST: (0, 83 - DARK, 81 - DARK),
+    Biome.MOUNTAIN: (99 - DARK, 89 - DARK, 92 - DARK),
+    Biome.SNOW: (208 - DARK, 229 - DARK, 227 - DARK),
+}
+
+
+OUTLINE_COLOUR = (50, 30, 50)
+HOVER_COLOUR = (255, 255, 255)
+HIGHLIGHT_COLOUR = (255, 255, 0)
+OPEN_COLOUR = (20, 150, 170)
+FIT_COLOUR = (70, 200, 190)
+
+
+def get_chunk_origin(chunk: tuple[int, int]) -> tuple[int, int]:
+    q = chunk[0] * CHUNK_SIZE
+    r = chunk[1] * CHUNK_SIZE
+    x, y = hex_to_world(HexPosition(q, r, -q - r))
+    return (math.floor(x) - BAKE_CENTRE[0], math.floor(y) - BAKE_CENTRE[1])
+
+
+def draw_hex(
+    surface: pygame.Surface,
+    centre: tuple[float, float],
+    corners: list[tuple[float, float]],
+    hex: HexTile,
+    hex_sprites: list[pygame.Surface],
+) -> None:
+    for i in range(6):
+        colour = (
+            BIOME_COLOUR_MAP[get_side(hex.sides, i)]
+            if hex.can_be_perfect
+            else BIOME_FAILED_COLOUR_MAP[get_side(hex.sides, i)]
+        )
+        sector = [corners[i - 1], corners[i], centre]
+        pygame.draw.polygon(surface, colour, sector)
+
+        if hex.sector_sprites is None:
+            continue
+
+        middle_x, middle_y = 0, 0
+        for p in sector:
+            middle_x += p[0]
+            middle_y += p[1]
+        middle_x /= len(sector)
+        middle_y /= len(sector)
+
+        for p in range(3):
+            if hex.sector_sprites[i][p] is None:
+                continue
+            offset = RENDER_OFFSETS_EVEN[p] if i % 2 == 0 else RENDER_OFFSETS_ODD[p]
+            surface.blit(
+                hex_sprites[hex.sector_sprites[i][p]],
+                (middle_x - 4 + offset[0], middle_y - 4 + offset[1]),
+            )
+
+    for i in range(6):
+        if get_side(hex.sides_touching, i) is not None:
+            continue
+        pygame.draw.line(
+            surface,
+            OUTLINE_COLOUR,
+            corners[i - 1],
+            corners[i],
+            OUTLINE_WIDTH,
+        )
+
+    # for i in range(6):
+    #     pygame.draw.circle(surface, OUTLINE_COLOUR, corners[i], 1)
+
+
+def render_hex(
+    surface: pygame.Surface,
+    camera: Camera,
+    hex: HexTile,
+    hex_sprites: list[pygame.Surface],
+) -> None:
+    centre = hex_to_world(hex.position)
+    screen_centre = camera.world_to_screen(*centre)
+    screen_corners = camera.world_to_screen_points(get_hex_corners(*centre))
+
+    draw_hex(surface, screen_centre, screen_corners, hex, hex_sprites)
+
+
+def bake_hex(hex: HexTile, hex_sprites: list[pygame.Surface]) -> pygame.Surface:
+    baked = pygame.Surface(BAKE_SIZE, pygame.SRCALPHA)
+    draw_hex(baked, BAKE_CENTRE, get_hex_corners(*BAKE_CENTRE), hex, hex_sprites)
+    return baked.convert_alpha()
+
+
+# Placed tiles only change appearance when their touching sides or perfect state
+# change, so each one is rasterised once and re-baked only when invalidated
+class HexSurfaceCache:
+    def __init__(self, hex_sprites: list[pygame.Surface]) -> None:
+        self.hex_sprites = hex_sprites
+        self.surfaces = {}
+
+    def get(self, hex: HexTile) -> pygame.Surface:
+        key = get_key(hex.position)
+        baked = self.surfaces.get(key)
+        if baked is None:
+            baked = bake_hex(hex, self.hex_sprites)
+            self.surfaces[key] = baked
+        return baked
+
+    def invalidate(self, hex_position: HexPosition) -> None:
+        self.surfaces.pop(get_key(hex_position), None)
+
+
+# The placed world is composited into one surface per chunk, so a frame blits a
+# handful of chunks and a placement only re-bakes the chunks it touched
+class ChunkLayer:
+    def __init__(self, grid: HexagonalGrid, hex_surfaces: HexSurfaceCache) -> None:
+        self.grid = grid
+        self.hex_surfaces = hex_surfaces
+        self.surfaces = {}  # Ordered from least to most recently drawn
+
+    def bake_chunk(self, chunk: tuple[int, int]) -> pygame.Surface:
+        baked = self.surfaces.pop(chunk, None)
+        if baked is None:
+            baked = pygame.Surface(CHUNK_SURFACE_SIZE, pygame.SRCALPHA).convert_alpha()
+        else:
+            baked.fill((0, 0, 0, 0))
+
+        origin_x, origin_y = get_chunk_origin(chunk)
+        blit_sequence = []
+        for hex in self.grid.chunks[chunk].values():
+            x, y = hex_to_world(hex.position)
+            blit_sequence.append(
+                (
+                    self.hex_surfaces.get(hex),
+                    (
+                        int(x - origin_x) - BAKE_CENTRE[0],
+                        int(y - origin_y) - BAKE_CENTRE[1],
+                    ),
+                )
+            )
+        baked.blits(blit_sequence, False)
+
+        self.grid.dirty_chunks.discard(chunk)
+        return baked
+
+    def render(
+        self, surface: pygame.Surface, camera: Camera, width: int, height: int
+    ) -> None:
+        for chunk in get_chunks_in_view(*get_view_bounds(camera, width, height)):
+            if chunk not in self.grid.chunks:
+                continue
+
+            if chunk in self.grid.dirty_chunks or chunk not in self.surfaces:
+                baked = self.bake_chunk(chunk)
+            else:
+                baked = self.surfaces.pop(chunk)
+            self.surfaces[chunk] = baked
+
+            surface.blit(baked, camera.world_to_screen(*get_chunk_origin(chunk)))
+
+        # Off-screen chunks are re-baked on demand, so only keep the most recent
+        while len(self.surfaces) > MAX_BAKED_CHUNKS:
+            chunk = next(iter(self.surfaces))
+            del self.surfaces[chunk]
+            for hex in self.grid.chunks[chunk].values():
+                self.hex_surfaces.invalidate(hex.position)
+
+
+def bake_open_hex(colour: tuple[int, int, int]) -> pygame.Surface:
+    baked = pygame.Surface(BAKE_SIZE, pygame.SRCALPHA)
+    pygame.draw.polygon(baked, colour, get_hex_corners(*BAKE_CENTRE))
+    return baked.convert_alpha()
+
+
+# Open cells are all the same shape, so each is one blit of a pre-rasterised
+# stamp. Positions are cached per chunk and only rebuilt when the grid changes
+class OpenCellLayer:
+    def __init__(self, grid: HexagonalGrid) -> None:
+        self.grid = grid
+        self.stamps = {}
+        self.positions = {}
+        self.version = grid.version
+
+    def get_stamp(self, colour: tuple[int, int, int]) -> pygame.Surface:
+        stamp = self.stamps.get(colour)
+        if stamp is None:
+            stamp = bake_open_hex(colour)
+            self.stamps[colour] = stamp
+        return stamp
+
+    def get_positions(self, chunk: tuple[int, int]) -> list[tuple[float, float]]:
+        positions = self.positions.get(chunk)
+        if positions is None:
+            positions = [
+                hex_to_world(key_to_position(key))
+                for key in self.grid.open_chunks.get(chunk, ())
+            ]
+            self.positions[chunk] = positions
+        return positions
+
+    def render(
+        self,
+        surface: pygame.Surface,
+        camera: Camera,
+        width: int,
+        height: int,
+        highlighted: set[int] = frozenset(),
+        highlight_colour: tuple[int, int, int] = FIT_COLOUR,
+    ) -> None:
+        if self.version != self.grid.version:
+            self.positions.clear()
+            self.version = self.grid.version
+
+        positions = []
+        for chunk in get_chunks_in_view(*get_view_bounds(camera, width, height)):
+            positions.extend(self.get_positions(chunk))
+        self.blit_stamps(surface, camera, positions, OPEN_COLOUR)
+
+        if highlighted:
+            positions = [hex_to_world(key_to_position(key)) for key in highlighted]
+            self.blit_stamps(surface, camera, positions, highlight_colour)
+
+    def blit_stamps(
+        self,
+        surface: pygame.Surface,
+        camera: Camera,
+        positions: list[tuple[float, float]],
+        colour: tuple[int, int, int],
+    ) -> None:
+        stamp = self.get_stamp(colour)
+        left, top = BAKE_CENTRE
+        surface.fblits(
+            [
+                (stamp, (x - left, y - top))
+                for x, y in camera.world_to_screen_points(positions)
+            ]
+        )
+
+
+def render_highlighted_hex(
+    surface: pygame.Surface,
+    camera: Camera,
+    hex_position: HexPosition,
+    sides: list[SideStates],
+) -> None:
+    centre = hex_to_world(hex_position)
+    screen_corners = camera.world_to_screen_points(get_hex_corners(*centre))
+
+    for i in range(6):
+        if sides[i] == SideStates.MISSMATCH:
+            continue
+        colour = HIGHLIGHT_COLOUR if sides[i] == SideStates.MATCH else HOVER_COLOUR
+        pygame.draw.line(
+            surface, colour, screen_corners[i - 1], screen_corners[i], OUTLINE_WIDTH
+        )
+
+
+def render_preview_hex(
+    surface: pygame.Surface, cx: int, cy: int, sides: HexSides
+) -> None:
+    screen_corners = get_hex_corners(cx, cy)
+
+    for i in range(6):
+        colour = BIOME_COLOUR_MAP[get_side(sides, i)]
+        sector = [screen_corners[i - 1], screen_corners[i], (cx, cy)]
+        pygame.draw.polygon(surface, colour, sector)
+
+    pygame.draw.polygon(surface, OUTLINE_COLOUR, screen_corners, OUTLINE_WIDTH)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+from typing import Optional
+from dataclasses import dataclass
+import heapq
+
+from components.hexagonalgrid import (
+    SIDE_SHIFTS,
+    SIDE_LOW_BITS,
+    NEIGHBOUR_KEY_OFFSETS,
+    HexPosition,
+    HexSides,
+    HexagonalGrid,
+    get_key,
+    get_canonical,
+    get_rotations,
+    key_to_position,
+)
+from components.engine import (
+    EDGE_SCORE,
+    PERFECT_SCORE,
+)
+
+HINT_COUNT = 3
+MAX_CACHED_SCORES = 1 << 16
+
+# A placement changes the facing pattern of its neighbours and can bring their
+# neighbours one side away from perfect, so only cells within two steps change
+NEARBY_KEY_OFFSETS = tuple(
+    {a + b for a in NEIGHBOUR_KEY_OFFSETS for b in NEIGHBOUR_KEY_OFFSETS + (0,)} - {0}
+)
+
+
+@dataclass
+class Hint:
+    position: HexPosition
+    rotation: int  # Number of times to rotate the tile before placing
+    sides: HexSides  # Tile sides after rotating
+    held: bool
+    score: int
+    can_be_perfect: bool
+
+
+class HintEngine:
+    def __init__(self, grid: HexagonalGrid) -> None:
+        self.grid = grid
+
+        # Open cell key -> (facing pattern, sides that would complete a neighbour)
+        self.cells = {}
+        for key in grid.open:
+            self.update_cell(key)
+
+        # (pattern, completing, canonical sides) -> (score, can be perfect, rotation)
+        self.scores = {}
+        self.hints = None
+        self.hint_tiles = None
+
+    def update_cell(self, key: int) -> None:
+        completing = 0
+        for i, offset in enumerate(NEIGHBOUR_KEY_OFFSETS):
+            adj_tile = self.grid.grid.get(key + offset)
+            if (
+                adj_tile is not None
+                and adj_tile.can_be_perfect
+                and adj_tile.matching_sides == 5
+            ):
+                completing |= 1 << SIDE_SHIFTS[i]
+
+        self.cells[key] = (self.grid.patterns[key], completing)
+
+    def on_place(self, hex_position: HexPosition) -> None:
+        key = get_key(hex_position)
+        self.cells.pop(key, None)
+        for offset in NEARBY_KEY_OFFSETS:
+            if key + offset in self.grid.open:
+                self.update_cell(key + offset)
+        self.hints = None
+
+    def evaluate(
+        self, pattern: HexSides, completing: int, sides: HexSides
+    ) -> tuple[int, bool, int]:
+        known = (pattern | pattern >> 1 | pattern >> 2) & SIDE_LOW_BITS
+
+        best = None
+        for rotation, rotated in enumerate(get_rotations(sides)):
+            difference = rotated ^ pattern
+            mismatched = (
+                difference | difference >> 1 | difference >> 2
+            ) & SIDE_LOW_BITS
+            matched = known & ~mismatched
+
+            score = matched.bit_count() * EDGE_SCORE
+            score += (matched & completing).bit_count() * PERFECT_SCORE
+            if matched == SIDE_LOW_BITS:
+                score += PERFECT_SCORE
+
+            result = (score, matched == known, -rotation)
+            if best is None or result > best:
+                best = result
+
+        return best[0], best[1], -best[2]
+
+    def get_score(
+        self, pattern: HexSides, completing: int, sides: HexSides
+    ) -> tuple[int, bool, int]:
+        # Cached against the canonical rotation so spinning the tile stays cached
+        canonical = get_canonical(sides)
+        cache_key = (pattern, completing, canonical)
+        result = self.scores.get(cache_key)
+        if result is None:
+            if len(self.scores) >= MAX_CACHED_SCORES:
+                self.scores.clear()
+            result = self.evaluate(pattern, completing, canonical)
+            self.scores[cache_key] = result
+
+        score, can_be_perfect, rotation = result
+        offset = get_rotations(sides).index(canonical)
+        return score, can_be_perfect, (offset + rotation) % 6
+
+    def get_hints(
+        self,
+        active: Optional[HexSides],
+        held: Optional[HexSides],
+        count: int = HINT_COUNT,
+    ) -> list[Hint]:
+        if self.hints is not None and self.hint_tiles == (active, held, count):
+            return self.hints
+
+        candidates = []
+        for is_held, sides in ((False, active), (True, held)):
+            if sides is None:
+                continue
+            for key, (pattern, completing) in self.cells.items():
+                score, can_be_perfect, rotation = self.get_score(
+                    pattern, completing, sides
+                )
+                candidates.append(
+                    (score, can_be_perfect, not is_held, key, rotation, sides)
+                )
+
+        self.hints = []
+        for candidate in heapq.nlargest(count, candidates):
+            score, can_be_perfect, not_held, key, rotation, sides = candidate
+            self.hints.append(
+                Hint(
+                    key_to_position(key),
+                    rotation,
+                    get_rotations(sides)[rotation],
+                    not not_held,
+                    score,
+                    can_be_perfect,
+                )
+            )
+        self.hint_tiles = (active, held, count)
+        return self.hints
@@ -1,7 +1,15 @@
 import random
+from collections import deque
 from typing import Optional
 
-from components.hexagonalgrid import Biome, HexTile, HexPosition, HexSides
+from components.hexagonalgrid import (
+    Biome,
+    HexTile,
+    HexPosition,
+    HexSides,
+    encode_sides,
+    rotate_sides,
+)
 
 
 STARTING_BIOME = Biome.GRASS
@@ -36,7 +44,7 @@ class TileManager:
         if self.active is None:
             return None
 
-        return HexTile(hex_position, self.active, [None] * 6, None)
+        return HexTile(hex_position, self.active, 0, None)
 
     def swap_held_tile(self) -> None:
         if self.held is not None:
@@ -73,18 +81,86 @@ class TileManager:
                 self.preview[i] = pick_random_tile()
 
     def rotate_active_tile(self) -> None:
-        last = self.active.pop()
-        self.active.insert(0, last)
+        if self.active is None:
+            return
+        self.active = rotate_sides(self.active)
 
 
 # Probability for number of unique biomes on a tile
 UNIQUE_BIOME_PROBABILITY = [0.1, 0.6, 0.2, 0.05, 0.03, 0.02]
 
+# Tiles are generated ahead of time in batches and handed out from a ring buffer.
+# Refills happen mid-placement, so batches are kept well under a millisecond
+TILE_BATCH_SIZE = 64
+
+BIOMES = list(Biome)
+
+
+# Vose's alias method, samples an index with the given probabilities in O(1)
+class AliasSampler:
+    def __init__(self, probabilities: list[float]) -> None:
+        self.length = len(probabilities)
+        self.probability = [1.0] * self.length
+        self.alias = list(range(self.length))
+
+        total = sum(probabilities)
+        scaled = [p * self.length / total for p in probabilities]
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def sample(self) -> int:
+        # One random number picks both the column and the coin flip
+        u = random.random() * self.length
+        i = int(u)
+        return i if u - i < self.probability[i] else self.alias[i]
+
+
+class TileStream:
+    def __init__(self, probabilities: list[float]) -> None:
+        self.sampler = AliasSampler(probabilities)
+        self.buffer = deque()
+        self.batch_size = TILE_BATCH_SIZE
+
+    def set_probabilities(self, probabilities: list[float]) -> None:
+        self.sampler = AliasSampler(probabilities)
+        self.buffer.clear()
+
+    # Drops tiles generated ahead, so the next ones come from the current seed
+    def clear(self) -> None:
+        self.buffer.clear()
+
+    def fill(self) -> None:
+        sample = self.sampler.sample
+        append = self.buffer.append
+        for _ in range(self.batch_size):
+            append(random_tile(random.sample(BIOMES, sample() + 1)))
+
+    def pop(self) -> HexSides:
+        if not self.buffer:
+            self.fill()
+        return self.buffer.popleft()
+
+
+tile_stream = TileStream(UNIQUE_BIOME_PROBABILITY)
+
+
+def set_unique_biome_probability(probabilities: list[float]) -> None:
+    UNIQUE_BIOME_PROBABILITY[:] = probabilities
+    tile_stream.set_probabilities(probabilities)
+
 
 def pick_random_tile() -> HexSides:
-    unique_biomes = pick_number_of_unique_biomes()
-    picked_biomes = pick_unique_biomes(unique_biomes)
-    return random_tile(picked_biomes)
+    return tile_stream.pop()
 
 
 # Ensures that starting biome is picked
@@ -95,30 +171,16 @@ def pick_random_starting_tile() -> HexSides:
 
 
 def random_tile(picked_biomes: list[Biome]) -> HexSides:
-    sides = [None] * 6
-    open = [i for i in range(6)]
-    random.shuffle(open)
-
-    # Ensure every unique biome is picked once
-    for b in picked_biomes:
-        sides[open.pop()] = b
-
-    while open:
-        sides[open.pop()] = random.choice(picked_biomes)
-
-    return sides
+    # Every unique biome is used once and the rest are filled from the same biomes
+    extra = 6 - len(picked_biomes)
+    sides = picked_biomes + [random.choice(picked_biomes) for _ in range(extra)]
+    random.shuffle(sides)
+    return encode_sides(sides)
 
 
 def pick_number_of_unique_biomes() -> int:
-    r = random.random()
-    for i, p in enumerate(UNIQUE_BIOME_PROBABILITY):
-        if r <= p:
-            return i + 1
-        r -= p
-    return 1  # Should never be hit
+    return tile_stream.sampler.sample() + 1
 
 
 def pick_unique_biomes(n: int) -> list[Biome]:
-    available = list(Biome)
-    random.shuffle(available)
-    return available[: min(len(available), abs(n))]
+    return random.sample(BIOMES, min(len(BIOMES), abs(n)))
@@ -1,27 +1,52 @@
+from functools import lru_cache
+
 import pygame
 
-from components.animationplayer import AnimationPlayer
+from components.animationplayer import AnimationPlayer, get_frames
 from components.camera import Camera
 from utilities.math import clamp
 
 
+TEXT_CACHE_SIZE = 256
+
+
+# HUD text rarely changes between frames, so a string is only rasterised again
+# once it has dropped out of the cache. Colours must be tuples to be hashable
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(font: pygame.font.Font, text: str, colour) -> pygame.Surface:
+    return font.render(text, False, colour)
+
+
 def render_to(
     surface: pygame.Surface, font: pygame.font.Font, text: str, dest, colour
 ) -> None:
-    text_render = font.render(text, False, colour)
+    text_render = render_text(font, text, colour)
     surface.blit(text_render, dest)
 
 
 def render_centered_text(
     surface: pygame.Surface, font: pygame.font.Font, text: str, dest, colour
 ):
-    text_render = font.render(text, False, colour)
+    text_render = render_text(font, text, colour)
     text_rect = text_render.get_rect()
     text_rect.center = dest
 
     surface.blit(text_render, text_rect)
 
 
+def build_fade_frames(
+    font: pygame.font.Font, text: str, colour, length: int
+) -> list[pygame.Surface]:
+    frames = []
+    for i in range(length):
+        frame = render_text(font, text, colour).copy()
+        frame.set_alpha(clamp(i * (1000 / length), 0, 255))
+
+        frames.append(frame)
+    frames.reverse()
+    return frames
+
+
 class PopupText:
     def __init__(
         self,
@@ -35,14 +60,11 @@ class PopupText:
         self.x = x
         self.y = y
 
-        frames = []
         length = int(duration / 0.05)
-        for i in range(length):
-            frame = font.render(text, False, colour)
-            frame.set_alpha(clamp(i * (1000 / length), 0, 255))
-
-            frames.append(frame)
-        frames.reverse()
+        frames = get_frames(
+            ("fade", font, text, colour, length),
+            lambda: build_fade_frames(font, text, colour, length),
+        )
 
         rect = frames[0].get_rect()
         self.offset_x = rect.w // 2
@@ -59,6 +81,12 @@ class PopupText:
         self.animator.update(dt)
         self.y -= 10 * dt
 
+    def get_rect(self, camera: Camera) -> pygame.Rect:
+        rect = self.animator.get_frame().get_rect()
+        x, y = camera.world_to_screen(self.x, self.y)
+        rect.topleft = (x - self.offset_x, y - self.offset_y)
+        return rect
+
     def render(self, surface: pygame.Surface, camera: Camera) -> None:
         screen_pos = camera.world_to_screen(self.x, self.y)
         screen_pos = (screen_pos[0] - self.offset_x, screen_pos[1] - self.offset_y)
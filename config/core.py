@@ -1,108 +1,253 @@
 import asyncio  # For web builds of the game
+import sys
+import time
 import pygame
 
 from utilities.decorators import singleton
 from utilities.typehints import InputBuffer
 from baseclasses.scenemanager import SceneManager
-from config.settings import WINDOW_SETUP, FPS, CAPTION, action_mappings
+from config.settings import (
+    WINDOW_SETUP,
+    FPS,
+    CAPTION,
+    FRAME_TIMES_PATH,
+    IDLE_FRAMES,
+    IDLE_FPS,
+    action_mappings,
+)
 from config.input import InputState, MouseButton, Action
-from scenes.game import Game
+from scenes.loading import Loading, progress_hooks
 
+# Key -> every action bound to it
+KEY_ACTIONS = {}
+for action, keys in action_mappings.items():
+    for key in keys:
+        KEY_ACTIONS.setdefault(key, []).append(action)
 
-@singleton
-class Core:
-    pygame.init()
+# Events that count towards input latency
+INPUT_EVENTS = {
+    pygame.KEYDOWN,
+    pygame.KEYUP,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.MOUSEMOTION,
+}
 
-    window = pygame.display.set_mode(WINDOW_SETUP['size'])
-    clock = pygame.time.Clock()
-    icon = pygame.image.load("assets/icon.png")
+# Pygame numbers mouse buttons from 1, wheel scrolls come through as 4 and up
+EVENT_BUTTONS = {button.value + 1: button for button in MouseButton}
 
-    pygame.display.set_icon(icon)
-    pygame.display.set_caption(CAPTION)
 
-    last_mouse_pressed = (False, False, False)
-    last_action_pressed = {action: False for action in Action}
-    last_action_mapping_pressed = {
-        action: action_mappings[action][0] for action in Action
+@singleton
+class Core:
+    # Allocated once and updated from events as they arrive, so a press and
+    # release between two frames still counts as a press
+    action_buffer = {
+        action: {state: False for state in InputState} for action in Action
+    }
+    mouse_buffer = {
+        button: {state: False for state in InputState} for button in MouseButton
     }
+    input_buffer = (action_buffer, mouse_buffer)
+    input_states = [*action_buffer.values(), *mouse_buffer.values()]
+    # Action -> how many of its keys are down, it is held while any are
+    held_keys = {action: 0 for action in Action}
+    # Bound keys that are down, so a repeated key down is only counted once
+    keys_down = set()
+
+    idle_frames = 0
+    had_input = False
+    # The event that ended an idle wait, handled before anything queued after it
+    woken_event = None
+    # Input events can only have arrived after the last read, so its time and
+    # this frame's read bound how long they waited before being drawn. None
+    # when there was no input
+    input_time = None
+    input_since = 0.0
+    last_read_time = 0.0
 
     def __init__(self) -> None:
-        self.scene_manager = SceneManager(Game)
-
-        theme_music = pygame.mixer.Sound("assets/hexagod.ogg")
-        pygame.mixer.Channel(0).set_volume(0.5)
-        pygame.mixer.Channel(0).play(theme_music, -1)
+        # Only what is needed to show the window happens up front, everything
+        # else is loaded over the first frames by the loading scene
+        self.startup_time = time.perf_counter()
+        self.startup_report = {}
+
+        pygame.init()
+        self.window = pygame.display.set_mode(WINDOW_SETUP["size"])
+        self.clock = pygame.time.Clock()
+        self.icon = pygame.image.load("assets/icon.png")
+
+        pygame.display.set_icon(self.icon)
+        pygame.display.set_caption(CAPTION)
+        self.mark_startup("window")
+
+        # Streamed rather than decoded up front, which used to dominate startup
+        pygame.mixer.music.load("assets/hexagod.ogg")
+        pygame.mixer.music.set_volume(0.5)
+        pygame.mixer.music.play(-1)
+        self.mark_startup("music")
+
+        progress_hooks.append(self.on_load_progress)
+        self.scene_manager = SceneManager(Loading)
+
+    def mark_startup(self, stage: str) -> None:
+        self.startup_report[stage] = time.perf_counter() - self.startup_time
+
+    def on_load_progress(self, loaded: int, total: int) -> None:
+        if loaded < total:
+            return
+
+        self.mark_startup("loaded")
+        report = " ".join(
+            f"{stage}={seconds * 1000:.0f}ms"
+            for stage, seconds in self.startup_report.items()
+        )
+        print(f"Startup {report}")
 
     async def run(self) -> None:
         while True:
-            elapsed_time = self.clock.tick(FPS)
-            dt = elapsed_time / 1000.0  # Convert to seconds
+            if self.idle_frames >= IDLE_FRAMES:
+                await self.wait_for_input()
+                # Time spent waiting is not simulated
+                self.clock.tick()
+                dt = 1 / FPS
+            else:
+                elapsed_time = self.clock.tick(FPS)
+                dt = elapsed_time / 1000.0  # Convert to seconds
 
             self.scene_manager.switched = False
+            frame_timer = self.scene_manager.frame_timer
 
+            start_time = time.perf_counter()
             self.check_for_quit()
             input_buffer = self.get_input()
+            frame_timer.record("events", time.perf_counter() - start_time)
 
             self.scene_manager.handle_input(input_buffer)
             self.scene_manager.update(dt)
             self.scene_manager.render(self.window)
 
-            pygame.display.flip()
+            start_time = time.perf_counter()
+            if self.scene_manager.dirty_rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.scene_manager.dirty_rects)
+            frame_timer.record("flip", time.perf_counter() - start_time)
+            if self.input_time is not None:
+                flip_time = time.perf_counter()
+                frame_timer.record("latency_min", flip_time - self.input_time)
+                frame_timer.record("latency_max", flip_time - self.input_since)
+            frame_timer.next_frame()
+
+            if self.had_input or not self.scene_manager.is_idle():
+                self.idle_frames = 0
+            else:
+                self.idle_frames += 1
+            if "first frame" not in self.startup_report:
+                self.mark_startup("first frame")
 
             await asyncio.sleep(0)
 
+    # Blocks until there is an event, or on the web where the browser must not
+    # be blocked, sleeps for an idle frame
+    async def wait_for_input(self) -> None:
+        if sys.platform == "emscripten":
+            await asyncio.sleep(1 / IDLE_FPS)
+            return
+
+        if pygame.event.peek():
+            return
+
+        # Nothing was queued, so whatever ends the wait arrived after this
+        self.last_read_time = time.perf_counter()
+        # Posting the event back would put it behind later ones, so it is kept
+        event = pygame.event.wait(1000 // IDLE_FPS)
+        if event.type != pygame.NOEVENT:
+            self.woken_event = event
+
+    # The buffers are updated in place, so scenes must not keep them between frames
     def get_input(self) -> InputBuffer:
-        # keys_pressed = pygame.key.get_just_pressed()
-        keys_held = pygame.key.get_pressed()
-        # keys_released = pygame.key.get_just_released()
+        return self.input_buffer
+
+    def press(self, states: dict[InputState, bool]) -> None:
+        states[InputState.PRESSED] = True
+        states[InputState.HELD] = True
+
+    def release(self, states: dict[InputState, bool]) -> None:
+        states[InputState.RELEASED] = True
+        states[InputState.HELD] = False
 
-        action_buffer = {}
+    # Key events can go missing while the window is unfocused, so what is held
+    # is read back from the keyboard rather than trusting the counts
+    def sync_held_keys(self) -> None:
+        keys_held = pygame.key.get_pressed()
+        self.keys_down.clear()
         for action in Action:
-            for mapping in action_mappings.get(action):
-                # Check if any alternate keys were just pressed
-                if mapping == self.last_action_mapping_pressed[action]:
-                    continue
+            self.held_keys[action] = 0
 
-                # If an alternate key was pressed, set that bind as the current bind to 'track'
-                if keys_held[mapping]:
-                    self.last_action_mapping_pressed[action] = mapping
-
-            tracked_mapping = self.last_action_mapping_pressed[action]
-            action_buffer[action] = {
-                InputState.PRESSED: keys_held[tracked_mapping]
-                and not self.last_action_pressed[action],
-                InputState.HELD: keys_held[tracked_mapping],
-                InputState.RELEASED: not keys_held[tracked_mapping]
-                and self.last_action_pressed[action],
-            }
-            self.last_action_pressed[action] = keys_held[tracked_mapping]
-
-        mouse_pressed = pygame.mouse.get_pressed()
-        mouse_buffer = {}
-        for button in MouseButton:
-            mouse_buffer[button] = {
-                InputState.PRESSED: (
-                    mouse_pressed[button.value]
-                    and not self.last_mouse_pressed[button.value]
-                ),
-                InputState.HELD: mouse_pressed[button.value],
-                InputState.RELEASED: (
-                    not mouse_pressed[button.value]
-                    and self.last_mouse_pressed[button.value]
-                ),
-            }
-        self.last_mouse_pressed = mouse_pressed
-
-        return action_buffer, mouse_buffer
+        for key, actions in KEY_ACTIONS.items():
+            if keys_held[key]:
+                self.keys_down.add(key)
+                for action in actions:
+                    self.held_keys[action] += 1
+
+        for action, states in self.action_buffer.items():
+            states[InputState.HELD] = self.held_keys[action] > 0
 
     def check_for_quit(self) -> None:
         if self.scene_manager.scene is None:
             self.terminate()
 
-        for event in pygame.event.get():
+        # Presses and releases only last the frame they happened in
+        for states in self.input_states:
+            states[InputState.PRESSED] = False
+            states[InputState.RELEASED] = False
+
+        events = pygame.event.get()
+        if self.woken_event is not None:
+            events.insert(0, self.woken_event)
+            self.woken_event = None
+        self.had_input = len(events) > 0
+        self.input_time = None
+        self.input_since = self.last_read_time
+        read_time = time.perf_counter()
+        self.last_read_time = read_time
+        for event in events:
+            if event.type in INPUT_EVENTS:
+                self.input_time = read_time
+
             if event.type == pygame.QUIT:
                 self.terminate()
+            elif event.type == pygame.KEYDOWN:
+                if event.key in self.keys_down or event.key not in KEY_ACTIONS:
+                    continue
+                self.keys_down.add(event.key)
+                for action in KEY_ACTIONS[event.key]:
+                    self.held_keys[action] += 1
+                    if self.held_keys[action] == 1:
+                        self.press(self.action_buffer[action])
+            elif event.type == pygame.KEYUP:
+                # Keys held down before the window had focus are let go
+                # without ever having been pressed
+                if event.key not in self.keys_down:
+                    continue
+                self.keys_down.discard(event.key)
+                for action in KEY_ACTIONS[event.key]:
+                    self.held_keys[action] -= 1
+                    if self.held_keys[action] == 0:
+                        self.release(self.action_buffer[action])
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button in EVENT_BUTTONS:
+                    self.press(self.mouse_buffer[EVENT_BUTTONS[event.button]])
+            elif event.type == pygame.MOUSEBUTTONUP:
+                if event.button in EVENT_BUTTONS:
+                    self.release(self.mouse_buffer[EVENT_BUTTONS[event.button]])
+            elif event.type == pygame.WINDOWFOCUSGAINED:
+                self.sync_held_keys()
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWSIZECHANGED):
+                self.scene_manager.redraw = True
 
     def terminate(self) -> None:
+        if FRAME_TIMES_PATH is not None:
+            self.scene_manager.frame_timer.export(FRAME_TIMES_PATH)
         pygame.quit()
         raise SystemExit
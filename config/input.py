@@ -18,3 +18,5 @@ class Action(Enum):
     RESTART = auto()
     CENTRE = auto()
     MUTE = auto()
+    HINT = auto()
+    PROFILE = auto()
@@ -2,7 +2,6 @@ import pygame
 
 from config.input import Action
 
-
 WINDOW_WIDTH = 640
 WINDOW_HEIGHT = 360
 WINDOW_SIZE = (WINDOW_WIDTH, WINDOW_HEIGHT)
@@ -19,10 +18,36 @@ WINDOW_SETUP = {
 CAPTION = "HEXAGOD"
 FPS = 60
 
+# The game is simulated in fixed steps whatever the frame rate, with at most
+# MAX_UPDATES steps a frame so a slow frame cannot snowball into slower ones
+UPDATE_RATE = 60
+MAX_UPDATES = 5
+
+# After this many frames with no input or animation the game waits for input,
+# waking at least IDLE_FPS times a second
+IDLE_FRAMES = 30
+IDLE_FPS = 4
+
+# Skip non-essential drawing like popups on the frame after one that overran
+FRAME_BUDGET_MODE = True
+
+# Read the mouse again just before drawing the hovered cell and tile preview,
+# so they follow the pointer rather than where it was when the frame started
+LATE_LATCH_MOUSE = True
+
+# Only redraw and update the parts of the screen that changed, which saves work
+# on idle frames
+DIRTY_RECTS = False
+
+# Frame timings are written here on exit, as CSV or JSON by file extension
+FRAME_TIMES_PATH = None
+
 
 action_mappings = {
     Action.HOLD: [pygame.K_f],
     Action.RESTART: [pygame.K_r],
     Action.CENTRE: [pygame.K_c],
     Action.MUTE: [pygame.K_m],
+    Action.HINT: [pygame.K_h],
+    Action.PROFILE: [pygame.K_F3],
 }
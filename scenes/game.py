@@ -1,38 +1,50 @@
 import math
+from typing import Any, Callable, Optional
 import pygame
 
 from utilities.typehints import ActionBuffer, MouseBuffer
 from config.input import InputState, MouseButton, Action
 from baseclasses.scenemanager import Scene, SceneManager
-from config.settings import WINDOW_CENTRE, WINDOW_WIDTH, WINDOW_HEIGHT
+from config.settings import (
+    WINDOW_CENTRE,
+    WINDOW_WIDTH,
+    WINDOW_HEIGHT,
+    LATE_LATCH_MOUSE,
+)
 from components.hexagonalgrid import (
     SIZE,
+    HEIGHT,
     HEXAGONAL_NEIGHBOURS,
-    OPEN_COLOUR,
-    OUTLINE_COLOUR,
-    HIGHLIGHT_COLOUR,
-    HOVER_COLOUR,
     Biome,
     SideStates,
     HexPosition,
-    HexTile,
-    HexagonalGrid,
     get_hex_corners,
     hex_to_world,
     world_to_hex,
     round_to_nearest_hex,
+    get_side_states,
+    get_canonical,
+    generate_hex_art,
+)
+from components.hexrenderer import (
+    OUTLINE_WIDTH,
+    OPEN_COLOUR,
+    OUTLINE_COLOUR,
+    HIGHLIGHT_COLOUR,
+    HOVER_COLOUR,
+    HexSurfaceCache,
+    ChunkLayer,
+    OpenCellLayer,
     render_hex,
-    render_open_hex,
     render_highlighted_hex,
     render_preview_hex,
-    generate_hex_art,
 )
-from components.tilemanager import TileManager, STARTING_BIOME
+from components.engine import GameEngine, ScoreEvent, ScoreEventType
+from components.hintengine import HintEngine
 from components.camera import Camera
 from components.ui import render_centered_text, PopupText, render_to
-from utilities.spriteloading import slice_sheet
-from components.animationplayer import AnimationPlayer
-
+from utilities.assets import AssetGroup
+from components.animationplayer import AnimationPlayer, get_frames
 
 PREVIEW_OFFSET = SIZE * 2
 PREVIEW_X = WINDOW_WIDTH - SIZE
@@ -44,22 +56,82 @@ HELD_Y = WINDOW_CENTRE[1]
 MOVE_X = WINDOW_CENTRE[0] - PREVIEW_OFFSET
 MOVE_Y = WINDOW_CENTRE[1] - SIZE
 
+# The HUD is drawn in the bands around the playing area
+HUD_RECTS = (
+    pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_CENTRE[1] - MOVE_Y),
+    pygame.Rect(0, 0, WINDOW_CENTRE[0] - MOVE_X, WINDOW_HEIGHT),
+    pygame.Rect(WINDOW_CENTRE[0] + MOVE_X, 0, WINDOW_CENTRE[0] - MOVE_X, WINDOW_HEIGHT),
+    pygame.Rect(0, WINDOW_CENTRE[1] + MOVE_Y, WINDOW_WIDTH, WINDOW_CENTRE[1] - MOVE_Y),
+)
+# Half the size of the area a placement can change, the tile and its neighbours
+PLACE_EXTENT = SIZE * 3
+
+PLACE_LENGTH = 16
+PERFECT_LENGTH = 16
+
+
+def build_place_frames() -> list[pygame.Surface]:
+    place_frames = []
+    for i in range(PLACE_LENGTH):
+        frame = pygame.Surface((SIZE * 4, SIZE * 4), pygame.SRCALPHA)
+        waves = get_hex_corners(
+            SIZE * 2, SIZE * 2, SIZE * (1.5 - i / (PLACE_LENGTH * 2))
+        )
+        pygame.draw.polygon(frame, (0, 0, 0, i * (150 / PLACE_LENGTH)), waves, 2)
+        place_frames.append(frame)
+    place_frames.reverse()
+    return place_frames
+
+
+def build_perfect_frames() -> list[pygame.Surface]:
+    perfect_frames = []
+    for i in range(PERFECT_LENGTH):
+        frame = pygame.Surface((SIZE * 2, SIZE * 2), pygame.SRCALPHA)
+        waves = get_hex_corners(SIZE, SIZE, SIZE * (i / (PLACE_LENGTH)))
+        pygame.draw.polygon(frame, (255, 255, 255, i * (150 / PLACE_LENGTH)), waves, 2)
+        perfect_frames.append(frame)
+    perfect_frames.reverse()
+    return perfect_frames
+
+
+# Everything Game loads, as separate steps so loading can be spread over frames
+def get_load_steps(assets: AssetGroup) -> list[Callable[[], Any]]:
+    return [
+        lambda: assets.sound("assets/hold.ogg"),
+        lambda: assets.sound("assets/perfect.ogg"),
+        lambda: assets.sound("assets/place.ogg"),
+        lambda: assets.sound("assets/rotate.ogg"),
+        lambda: assets.font("assets/joystix.ttf", 8),
+        lambda: assets.font("assets/joystix.ttf", 10),
+        lambda: assets.font("assets/joystix.ttf", 20),
+        lambda: assets.sheet("assets/tiles-Sheet.png", 8, 8),
+        lambda: get_frames("place", build_place_frames),
+        lambda: get_frames("perfect", build_perfect_frames),
+    ]
+
+
+# The mouse is near enough the edges of the window to move the camera
+def is_panning(mx: int, my: int) -> bool:
+    return abs(WINDOW_CENTRE[0] - mx) > MOVE_X or abs(WINDOW_CENTRE[1] - my) > MOVE_Y
+
 
 class Game(Scene):
     def __init__(self, scene_manager: SceneManager) -> None:
         super().__init__(scene_manager)
 
+        self.assets = AssetGroup()
+
         self.muted = False
-        self.hold_sfx = pygame.mixer.Sound("assets/hold.ogg")
-        self.perfect_sfx = pygame.mixer.Sound("assets/perfect.ogg")
-        self.place_sfx = pygame.mixer.Sound("assets/place.ogg")
-        self.rotate_sfx = pygame.mixer.Sound("assets/rotate.ogg")
+        self.hold_sfx = self.assets.sound("assets/hold.ogg")
+        self.perfect_sfx = self.assets.sound("assets/perfect.ogg")
+        self.place_sfx = self.assets.sound("assets/place.ogg")
+        self.rotate_sfx = self.assets.sound("assets/rotate.ogg")
 
-        self.popup_font = pygame.font.Font("assets/joystix.ttf", 8)
-        self.font = pygame.font.Font("assets/joystix.ttf", 10)
-        self.big_font = pygame.font.Font("assets/joystix.ttf", 20)
+        self.popup_font = self.assets.font("assets/joystix.ttf", 8)
+        self.font = self.assets.font("assets/joystix.ttf", 10)
+        self.big_font = self.assets.font("assets/joystix.ttf", 20)
 
-        self.BIOME_SPRITES = slice_sheet("assets/tiles-Sheet.png", 8, 8)
+        self.BIOME_SPRITES = self.assets.sheet("assets/tiles-Sheet.png", 8, 8)
         self.BIOME_SPRITE_MAP = {
             Biome.SWAMP: [0, 6, 12],
             Biome.GRASS: [1, 7, 13],
@@ -69,44 +141,48 @@ class Game(Scene):
             Biome.SNOW: [5, 11, 17],
         }
 
-        self.hex_grid = HexagonalGrid()
-        start_hex = HexTile(
-            HexPosition(0, 0, 0), [STARTING_BIOME] * 6, [None] * 6, None
-        )
+        self.engine = GameEngine()
+        self.hex_grid = self.engine.grid
+        self.tile_manager = self.engine.tile_manager
+        self.hex_surfaces = HexSurfaceCache(self.BIOME_SPRITES)
+        self.world_layer = ChunkLayer(self.hex_grid, self.hex_surfaces)
+        self.open_layer = OpenCellLayer(self.hex_grid)
+        self.hint_engine = HintEngine(self.hex_grid)
+        self.show_hints = False
+
+        start_hex = self.hex_grid.get_tile(HexPosition(0, 0, 0))
         start_hex.sector_sprites = generate_hex_art(
             start_hex.sides, self.BIOME_SPRITE_MAP
         )
-        self.hex_grid.add_tile(start_hex)
 
-        self.tile_manager = TileManager(6, 50)
         self.camera = Camera(0, 0, *WINDOW_CENTRE)
+        self.input_x, self.input_y = 0, 0
+
+        # Presses are kept until an update acts on them, as a frame can run
+        # any number of updates
+        self.hold = False
+        self.centre = False
+        self.toggle_mute = False
+        self.toggle_hints = False
+        self.rotate = False
+        self.try_place = False
 
         self.hovered_tile = HexPosition(0, 0, 0)
-        self.score = 0
-
-        place_frames = []
-        place_length = 16
-        for i in range(place_length):
-            frame = pygame.Surface((SIZE * 4, SIZE * 4), pygame.SRCALPHA)
-            waves = get_hex_corners(
-                SIZE * 2, SIZE * 2, SIZE * (1.5 - i / (place_length * 2))
-            )
-            pygame.draw.polygon(frame, (0, 0, 0, i * (150 / place_length)), waves, 2)
-            place_frames.append(frame)
-        place_frames.reverse()
+
+        # Only recomputed when the hovered cell, active tile or grid change
+        self.highlight_state = None
+        self.highlight_sides = [SideStates.UNKNOWN] * 6
+        self.fits_state = None
+        self.fits = set()
+
+        # Name -> (state, screen rects) of everything drawn last frame
+        self.regions = {}
+
+        place_frames = get_frames("place", build_place_frames)
         self.place_animation = AnimationPlayer("place", place_frames, 0.05, False)
         self.place_location = (0, 0)
 
-        perfect_frames = []
-        perfect_length = 16
-        for i in range(perfect_length):
-            frame = pygame.Surface((SIZE * 2, SIZE * 2), pygame.SRCALPHA)
-            waves = get_hex_corners(SIZE, SIZE, SIZE * (i / (place_length)))
-            pygame.draw.polygon(
-                frame, (255, 255, 255, i * (150 / place_length)), waves, 2
-            )
-            perfect_frames.append(frame)
-        perfect_frames.reverse()
+        perfect_frames = get_frames("perfect", build_perfect_frames)
         self.perfect_animations = [
             AnimationPlayer("perfect", perfect_frames, 0.05, False) for i in range(7)
         ]
@@ -121,6 +197,9 @@ class Game(Scene):
             for _ in range(7)
         ]
 
+    def exit(self) -> None:
+        self.assets.release()
+
     def handle_input(
         self, action_buffer: ActionBuffer, mouse_buffer: MouseBuffer
     ) -> None:
@@ -133,116 +212,63 @@ class Game(Scene):
         dy = WINDOW_CENTRE[1] - my
         d = math.sqrt(dx**2 + dy**2)
 
-        if abs(dx) > MOVE_X or abs(dy) > MOVE_Y:
+        if is_panning(mx, my):
             self.input_x = -dx / d
             self.input_y = -dy / d
         else:
-            offset_mouse_position = self.camera.screen_to_world(mx, my)
-            hex = world_to_hex(*offset_mouse_position)
-            self.hovered_tile = round_to_nearest_hex(hex)
+            self.hover(mx, my)
 
-        self.hold = action_buffer[Action.HOLD][InputState.PRESSED]
-        self.centre = action_buffer[Action.CENTRE][InputState.PRESSED]
-        self.toggle_mute = action_buffer[Action.MUTE][InputState.PRESSED]
-        self.rotate = mouse_buffer[MouseButton.RIGHT][InputState.PRESSED]
-        self.try_place = mouse_buffer[MouseButton.LEFT][InputState.PRESSED]
+        self.hold |= action_buffer[Action.HOLD][InputState.PRESSED]
+        self.centre |= action_buffer[Action.CENTRE][InputState.PRESSED]
+        self.toggle_mute |= action_buffer[Action.MUTE][InputState.PRESSED]
+        self.toggle_hints |= action_buffer[Action.HINT][InputState.PRESSED]
+        self.rotate |= mouse_buffer[MouseButton.RIGHT][InputState.PRESSED]
+        self.try_place |= mouse_buffer[MouseButton.LEFT][InputState.PRESSED]
 
     def update(self, dt: float) -> None:
         if not pygame.mouse.get_focused():
-            pygame.mixer.Channel(0).pause()
+            pygame.mixer.music.pause()
         else:
-            pygame.mixer.Channel(0).unpause()
+            pygame.mixer.music.unpause()
 
         self.camera.move(dt, self.input_x, self.input_y)
 
         if self.toggle_mute:
             self.muted = not self.muted
             if self.muted:
-                pygame.mixer.Channel(0).set_volume(0)
+                pygame.mixer.music.set_volume(0)
                 pygame.mixer.Channel(1).set_volume(0)
                 pygame.mixer.Channel(2).set_volume(0)
                 pygame.mixer.Channel(3).set_volume(0)
                 pygame.mixer.Channel(4).set_volume(0)
             else:
-                pygame.mixer.Channel(0).set_volume(0.5)
+                pygame.mixer.music.set_volume(0.5)
                 pygame.mixer.Channel(1).set_volume(1)
                 pygame.mixer.Channel(2).set_volume(1)
                 pygame.mixer.Channel(3).set_volume(1)
                 pygame.mixer.Channel(4).set_volume(1)
 
+        if self.toggle_hints:
+            self.show_hints = not self.show_hints
+
         if self.centre:
-            self.camera.x = 0
-            self.camera.y = 0
+            self.camera.set_position(0, 0)
 
+        events = []
         if self.hold:
-            self.tile_manager.swap_held_tile()
-            pygame.mixer.Channel(1).play(self.hold_sfx)
+            events += self.engine.hold()
 
         if self.rotate:
-            self.tile_manager.rotate_active_tile()
-            pygame.mixer.Channel(4).play(self.rotate_sfx)
+            events += self.engine.rotate()
+
+        if self.try_place:
+            events += self.engine.place(self.hovered_tile)
+
+        for event in events:
+            self.handle_score_event(event)
 
-        if self.try_place and self.hex_grid.is_open(self.hovered_tile):
-            tile = self.tile_manager.create_active_tile(self.hovered_tile)
-            if tile is not None:
-                tile.sector_sprites = generate_hex_art(
-                    tile.sides, self.BIOME_SPRITE_MAP
-                )
-
-                self.hex_grid.add_tile(tile)
-                pygame.mixer.Channel(3).play(self.place_sfx)
-
-                # Scoring
-                for i, neighbour in enumerate(HEXAGONAL_NEIGHBOURS):
-                    position = self.hovered_tile + neighbour
-                    adj_tile = self.hex_grid.get_tile(position)
-
-                    if adj_tile is None:
-                        continue
-
-                    # If same biomes are touching
-                    tile.sides_touching[i] = adj_tile.sides[(i + 3) % 6]
-                    adj_tile.sides_touching[(i + 3) % 6] = tile.sides[i]
-                    if tile.sides[i] == adj_tile.sides[(i + 3) % 6]:
-                        popup_pos = hex_to_world(tile.position)
-                        offset_pos = hex_to_world(neighbour)
-                        edge_pos = (
-                            popup_pos[0] + offset_pos[0] // 2,
-                            popup_pos[1] + offset_pos[1] // 2,
-                        )
-                        self.edge_popup_text[i].move(*edge_pos)
-                        self.score += 10
-                        tile.matching_sides += 1
-                        adj_tile.matching_sides += 1
-
-                        if adj_tile.matching_sides == 6:
-                            self.score += 100
-                            self.tile_manager.add_to_remaining(3)
-                            self.perfect_popup_text[i + 1].move(
-                                *hex_to_world(adj_tile.position)
-                            )
-                            pygame.mixer.Channel(2).play(self.perfect_sfx)
-                            self.perfect_locations[i + 1] = hex_to_world(
-                                adj_tile.position
-                            )
-                            self.perfect_animations[i + 1].reset()
-                    else:
-                        tile.can_be_perfect = False
-                        adj_tile.can_be_perfect = False
-
-                if tile.matching_sides == 6:
-                    self.score += 100
-                    self.tile_manager.add_to_remaining(3)
-
-                    self.perfect_popup_text[0].move(*popup_pos)
-                    pygame.mixer.Channel(2).play(self.perfect_sfx)
-                    self.perfect_locations[0] = hex_to_world(tile.position)
-                    self.perfect_animations[0].reset()
-
-                self.tile_manager.get_next_tile()
-
-                self.place_location = hex_to_world(tile.position)
-                self.place_animation.reset()
+        self.hold = self.centre = self.toggle_mute = self.toggle_hints = False
+        self.rotate = self.try_place = False
 
         self.place_animation.update(dt)
         for anim in self.perfect_animations:
@@ -254,11 +280,203 @@ class Game(Scene):
         for text in self.perfect_popup_text:
             text.update(dt)
 
+    def handle_score_event(self, event: ScoreEvent) -> None:
+        if event.type == ScoreEventType.HOLD:
+            pygame.mixer.Channel(1).play(self.hold_sfx)
+
+        elif event.type == ScoreEventType.ROTATE:
+            pygame.mixer.Channel(4).play(self.rotate_sfx)
+
+        elif event.type == ScoreEventType.PLACE:
+            tile = self.hex_grid.get_tile(event.position)
+            tile.sector_sprites = generate_hex_art(tile.sides, self.BIOME_SPRITE_MAP)
+
+            self.hint_engine.on_place(event.position)
+
+            # Every placed neighbour now has a new touching side
+            for adj_tile in self.hex_grid.get_neighbour_tiles(event.position):
+                if adj_tile is not None:
+                    self.hex_surfaces.invalidate(adj_tile.position)
+
+            pygame.mixer.Channel(3).play(self.place_sfx)
+            self.place_location = hex_to_world(event.position)
+            self.place_animation.reset()
+
+        elif event.type == ScoreEventType.EDGE_MATCH:
+            popup_pos = hex_to_world(event.position)
+            offset_pos = hex_to_world(HEXAGONAL_NEIGHBOURS[event.side])
+            edge_pos = (
+                popup_pos[0] + offset_pos[0] // 2,
+                popup_pos[1] + offset_pos[1] // 2,
+            )
+            self.edge_popup_text[event.side].move(*edge_pos)
+
+        elif event.type == ScoreEventType.PERFECT:
+            # Slot 0 is the placed tile, the rest follow its neighbours
+            slot = 0 if event.side is None else event.side + 1
+            perfect_pos = hex_to_world(event.position)
+            self.perfect_popup_text[slot].move(*perfect_pos)
+            pygame.mixer.Channel(2).play(self.perfect_sfx)
+            self.perfect_locations[slot] = perfect_pos
+            self.perfect_animations[slot].reset()
+
+    def render_hints(self, surface: pygame.Surface) -> None:
+        hints = self.hint_engine.get_hints(
+            self.tile_manager.get_active(), self.tile_manager.get_held()
+        )
+        for hint in hints:
+            pattern = self.hex_grid.get_facing_pattern(hint.position)
+            sides = get_side_states(hint.sides, pattern)
+            render_highlighted_hex(surface, self.camera, hint.position, sides)
+
+    def get_highlight_sides(self) -> list[SideStates]:
+        active = self.tile_manager.get_active()
+        state = (self.hovered_tile, active, self.hex_grid.version)
+        if state == self.highlight_state:
+            return self.highlight_sides
+
+        self.highlight_sides = [SideStates.UNKNOWN] * 6
+        if self.hex_grid.is_open(self.hovered_tile) and active is not None:
+            pattern = self.hex_grid.get_facing_pattern(self.hovered_tile)
+            self.highlight_sides = get_side_states(active, pattern)
+
+        self.highlight_state = state
+        return self.highlight_sides
+
+    # Cells the active tile fits perfectly in some rotation, shown with hints
+    def get_fits(self) -> set[int]:
+        active = self.tile_manager.get_active()
+        canonical = get_canonical(active) if active is not None else None
+        state = (canonical, self.hex_grid.version)
+        if state == self.fits_state:
+            return self.fits
+
+        self.fits = set()
+        if active is not None:
+            self.fits = {key for key, _ in self.hex_grid.find_fits(active)}
+
+        self.fits_state = state
+        return self.fits
+
+    def hover(self, mx: int, my: int) -> None:
+        offset_mouse_position = self.camera.screen_to_world(mx, my)
+        hex = world_to_hex(*offset_mouse_position)
+        self.hovered_tile = round_to_nearest_hex(hex)
+
+    def interpolate(self, alpha: float) -> None:
+        self.camera.interpolate(alpha)
+
+        # Pumping picks up where the mouse moved while the frame was updating,
+        # the events stay queued for the next frame
+        if LATE_LATCH_MOUSE:
+            pygame.event.pump()
+            mx, my = pygame.mouse.get_pos()
+            if not is_panning(mx, my):
+                self.hover(mx, my)
+
+    def get_animations(self) -> list[AnimationPlayer]:
+        popups = self.edge_popup_text + self.perfect_popup_text
+        return (
+            [self.place_animation]
+            + self.perfect_animations
+            + [text.animator for text in popups]
+        )
+
+    def is_idle(self) -> bool:
+        return (
+            self.input_x == 0
+            and self.input_y == 0
+            and all(animation.is_finished() for animation in self.get_animations())
+        )
+
+    def get_screen_rect(
+        self, world: tuple[float, float], half_width: float, half_height: float
+    ) -> pygame.Rect:
+        x, y = self.camera.world_to_screen(*world)
+        return pygame.Rect(
+            x - half_width, y - half_height, half_width * 2, half_height * 2
+        )
+
+    # Every part of the frame that can change on its own, with the state it was
+    # drawn from so a change of state marks its old and new area dirty
+    def get_regions(self) -> dict[str, tuple[object, list[pygame.Rect]]]:
+        padding = OUTLINE_WIDTH + 1
+        active = self.tile_manager.get_active()
+        regions = {
+            "view": (
+                (
+                    self.camera.x,
+                    self.camera.y,
+                    self.show_hints,
+                    self.hex_grid.version if self.show_hints else None,
+                ),
+                [],
+            ),
+            "hover": (
+                (self.hovered_tile, active, tuple(self.get_highlight_sides())),
+                [
+                    self.get_screen_rect(
+                        hex_to_world(self.hovered_tile),
+                        SIZE + padding,
+                        HEIGHT / 2 + padding,
+                    )
+                ],
+            ),
+            "place": (
+                (self.hex_grid.version, self.place_animation.frame_index),
+                [self.get_screen_rect(self.place_location, PLACE_EXTENT, PLACE_EXTENT)],
+            ),
+            "hud": (
+                (
+                    self.engine.score,
+                    self.tile_manager.get_remaining(),
+                    self.tile_manager.get_held(),
+                    tuple(self.tile_manager.get_preview()),
+                    self.hovered_tile,
+                    self.engine.is_game_over(),
+                ),
+                list(HUD_RECTS),
+            ),
+        }
+
+        for i, anim in enumerate(self.perfect_animations):
+            location = self.perfect_locations[i]
+            regions[f"perfect {i}"] = (
+                (location, anim.frame_index),
+                [self.get_screen_rect(location, SIZE, SIZE)],
+            )
+
+        popups = self.edge_popup_text + self.perfect_popup_text
+        for i, text in enumerate(popups):
+            # Finished popups keep drifting but are invisible
+            state = None if text.animator.is_finished() else (text.x, text.y)
+            regions[f"popup {i}"] = (
+                (state, text.animator.frame_index),
+                [text.get_rect(self.camera)],
+            )
+
+        return regions
+
+    def get_dirty_rects(self) -> Optional[list[pygame.Rect]]:
+        regions = self.get_regions()
+        last_regions = self.regions
+        self.regions = regions
+        if last_regions.get("view", (None,))[0] != regions["view"][0]:
+            return None
+
+        rects = []
+        for name, (state, region_rects) in regions.items():
+            last_state, last_rects = last_regions.get(name, (None, []))
+            if state != last_state:
+                rects.extend(last_rects)
+                rects.extend(region_rects)
+        return rects
+
     def render(self, surface: pygame.Surface) -> None:
         surface.fill((83, 216, 251))
 
-        for hex_position_tuple in self.hex_grid.get_open_tiles():
-            render_open_hex(surface, self.camera, HexPosition(*hex_position_tuple))
+        fits = self.get_fits() if self.show_hints else set()
+        self.open_layer.render(surface, self.camera, WINDOW_WIDTH, WINDOW_HEIGHT, fits)
 
         place_screen = self.camera.world_to_screen(*self.place_location)
         place_screen = (place_screen[0] - SIZE * 2, place_screen[1] - SIZE * 2)
@@ -268,39 +486,27 @@ class Game(Scene):
         if active_tile is not None:
             render_hex(surface, self.camera, active_tile, self.BIOME_SPRITES)
 
-        for hex in self.hex_grid.get_placed_tiles():
-            render_hex(surface, self.camera, hex, self.BIOME_SPRITES)
-
-        matching_sides = [SideStates.UNKNOWN] * 6
-        if (
-            self.hex_grid.is_open(self.hovered_tile)
-            and self.tile_manager.get_active() is not None
-        ):
-            for i, neighbour in enumerate(HEXAGONAL_NEIGHBOURS):
-                position = self.hovered_tile + neighbour
-                adj_tile = self.hex_grid.get_tile(position)
+        self.world_layer.render(surface, self.camera, WINDOW_WIDTH, WINDOW_HEIGHT)
 
-                if adj_tile is None:
-                    continue
-
-                # If same biomes are touching
-                if self.tile_manager.get_active()[i] == adj_tile.sides[(i + 3) % 6]:
-                    matching_sides[i] = SideStates.MATCH
-                else:
-                    matching_sides[i] = SideStates.MISSMATCH
+        render_highlighted_hex(
+            surface, self.camera, self.hovered_tile, self.get_highlight_sides()
+        )
 
-        render_highlighted_hex(surface, self.camera, self.hovered_tile, matching_sides)
+        if self.show_hints:
+            self.render_hints(surface)
 
         for i, anim in enumerate(self.perfect_animations):
             perfect_screen = self.camera.world_to_screen(*self.perfect_locations[i])
             perfect_screen = (perfect_screen[0] - SIZE, perfect_screen[1] - SIZE)
             surface.blit(anim.get_frame(), perfect_screen)
 
-        for text in self.edge_popup_text:
-            text.render(surface, self.camera)
+        # Popups are the first thing to go when frames take too long
+        if not self.scene_manager.is_over_budget():
+            for text in self.edge_popup_text:
+                text.render(surface, self.camera)
 
-        for text in self.perfect_popup_text:
-            text.render(surface, self.camera)
+            for text in self.perfect_popup_text:
+                text.render(surface, self.camera)
 
         pygame.draw.rect(
             surface,
@@ -364,15 +570,12 @@ class Game(Scene):
         render_centered_text(
             surface,
             self.big_font,
-            f"{self.score}",
+            f"{self.engine.score}",
             (WINDOW_CENTRE[0], PREVIEW_Y),
             HOVER_COLOUR,
         )
 
-        if (
-            self.tile_manager.get_remaining() == 0
-            and self.tile_manager.get_active() is None
-        ):
+        if self.engine.is_game_over():
             render_to(surface, self.font, "GAME OVER!", (3, 5), OUTLINE_COLOUR)
             render_to(
                 surface,
@@ -0,0 +1,80 @@
+import importlib
+import time
+from typing import Callable
+import pygame
+
+from utilities.typehints import ActionBuffer, MouseBuffer
+from utilities.assets import AssetGroup
+from baseclasses.scenemanager import Scene, SceneManager
+from config.settings import WINDOW_WIDTH, WINDOW_HEIGHT
+
+# Loading is spread across frames so the window keeps responding, running as
+# many steps as fit in this much time each frame
+LOAD_BUDGET = 1 / 120
+
+BAR_WIDTH = WINDOW_WIDTH // 2
+BAR_HEIGHT = 8
+
+BACKGROUND_COLOUR = (83, 216, 251)
+BAR_COLOUR = (50, 30, 50)
+
+# Called with (loaded steps, total steps) after every step
+progress_hooks: list[Callable[[int, int], None]] = []
+
+
+class Loading(Scene):
+    def __init__(self, scene_manager: SceneManager) -> None:
+        super().__init__(scene_manager)
+
+        # Keeps everything loaded until the game has acquired it for itself
+        self.assets = AssetGroup()
+        self.steps = [self.import_game]
+        self.loaded = 0
+        # Nothing is loaded before the first frame so the window shows right away
+        self.rendered = False
+
+    # The game and everything it imports is only loaded once the window is up
+    def import_game(self) -> None:
+        self.game = importlib.import_module("scenes.game")
+        self.steps.extend(self.game.get_load_steps(self.assets))
+
+    def exit(self) -> None:
+        self.assets.release()
+
+    def handle_input(
+        self, action_buffer: ActionBuffer, mouse_buffer: MouseBuffer
+    ) -> None:
+        pass
+
+    def update(self, dt: float) -> None:
+        pass
+
+    # Loading is paced per frame, fixed updates can run many times a frame or
+    # not at all
+    def update_frame(self, dt: float) -> None:
+        if not self.rendered:
+            return
+
+        start_time = time.perf_counter()
+        while self.loaded < len(self.steps):
+            self.steps[self.loaded]()
+            self.loaded += 1
+            for hook in progress_hooks:
+                hook(self.loaded, len(self.steps))
+
+            if time.perf_counter() - start_time > LOAD_BUDGET:
+                return
+
+        self.scene_manager.switch_scene(self.game.Game)
+
+    def render(self, surface: pygame.Surface) -> None:
+        self.rendered = True
+        surface.fill(BACKGROUND_COLOUR)
+
+        x = (WINDOW_WIDTH - BAR_WIDTH) // 2
+        y = (WINDOW_HEIGHT - BAR_HEIGHT) // 2
+        progress = self.loaded / len(self.steps)
+        pygame.draw.rect(surface, BAR_COLOUR, (x, y, BAR_WIDTH, BAR_HEIGHT), 1)
+        pygame.draw.rect(
+            surface, BAR_COLOUR, (x, y, int(BAR_WIDTH * progress), BAR_HEIGHT)
+        )
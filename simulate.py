@@ -0,0 +1,244 @@
+# Headless Monte Carlo simulator for tuning the tile distribution
+# Example: python simulate.py --games 100000 --policy greedy --tiles 40 --tiles 50
+import argparse
+import importlib
+import json
+import math
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+import components.tilemanager as tilemanager
+from components.engine import GameEngine, PREVIEW_LENGTH, STARTING_TILES
+from components.hexagonalgrid import (
+    HexPosition,
+    count_matches,
+    get_rotations,
+    key_to_position,
+)
+
+
+BATCH_SIZE = 500
+
+Policy = Callable[[GameEngine], tuple[HexPosition, int]]
+
+
+def random_policy(engine: GameEngine) -> tuple[HexPosition, int]:
+    key = random.choice(tuple(engine.grid.open))
+    return key_to_position(key), random.randrange(6)
+
+
+# Picks the placement with the most matching edges, ignoring future turns
+def greedy_policy(engine: GameEngine) -> tuple[HexPosition, int]:
+    rotations = get_rotations(engine.tile_manager.get_active())
+
+    best = []
+    best_matches = -1
+    for key in engine.grid.open:
+        pattern = engine.grid.get_facing_pattern(key_to_position(key))
+        for rotation, sides in enumerate(rotations):
+            matches = count_matches(sides, pattern)
+            if matches > best_matches:
+                best_matches = matches
+                best = [(key, rotation)]
+            elif matches == best_matches:
+                best.append((key, rotation))
+
+    key, rotation = random.choice(best)
+    return key_to_position(key), rotation
+
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+}
+
+
+# Accepts a built in policy name or a 'module:function' path to a custom policy
+def load_policy(name: str) -> Policy:
+    if name in POLICIES:
+        return POLICIES[name]
+
+    module_name, _, function_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def play_game(policy: Policy, preview_length: int, tiles: int) -> GameEngine:
+    engine = GameEngine(preview_length, tiles)
+    while not engine.is_game_over():
+        position, rotation = policy(engine)
+        # A refused placement leaves the game as it was, so it would never end
+        if not engine.place(position, rotation):
+            raise ValueError(f"policy chose {position}, which is not an open cell")
+    return engine
+
+
+def run_batch(
+    config_index: int,
+    probabilities: list[float],
+    tiles: int,
+    preview_length: int,
+    policy_name: str,
+    seed: int,
+    start: int,
+    count: int,
+) -> tuple[int, Counter, Counter, int, int]:
+    tilemanager.set_unique_biome_probability(probabilities)
+    # Each game's tiles are generated in one go, the stream is emptied between
+    tilemanager.tile_stream.batch_size = tiles + preview_length
+    policy = load_policy(policy_name)
+
+    scores = Counter()
+    lengths = Counter()
+    placed = 0
+    perfects = 0
+    for game in range(start, start + count):
+        # Every game is seeded on its own so results do not depend on scheduling
+        random.seed(f"{seed}-{config_index}-{game}")
+        # Tiles generated ahead for the last game would otherwise carry over
+        tilemanager.tile_stream.clear()
+        engine = play_game(policy, preview_length, tiles)
+
+        scores[engine.score] += 1
+        lengths[engine.placed - 1] += 1
+        placed += engine.placed - 1
+        perfects += engine.perfects
+
+    return config_index, scores, lengths, placed, perfects
+
+
+def percentile(histogram: Counter, fraction: float) -> int:
+    target = fraction * (histogram.total() - 1)
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen > target:
+            return value
+    return 0
+
+
+def summarise(histogram: Counter) -> dict[str, float]:
+    total = histogram.total()
+    mean = sum(value * count for value, count in histogram.items()) / total
+    variance = (
+        sum((value - mean) ** 2 * count for value, count in histogram.items()) / total
+    )
+    return {
+        "mean": round(mean, 2),
+        "std": round(math.sqrt(variance), 2),
+        "min": min(histogram),
+        "p5": percentile(histogram, 0.05),
+        "p50": percentile(histogram, 0.5),
+        "p95": percentile(histogram, 0.95),
+        "max": max(histogram),
+    }
+
+
+def parse_probabilities(text: str) -> list[float]:
+    probabilities = [float(p) for p in text.split(",")]
+    if len(probabilities) != len(tilemanager.UNIQUE_BIOME_PROBABILITY):
+        raise argparse.ArgumentTypeError(
+            f"expected {len(tilemanager.UNIQUE_BIOME_PROBABILITY)} probabilities"
+        )
+    return probabilities
+
+
+def parse_games(text: str) -> int:
+    games = int(text)
+    if games < 1:
+        raise argparse.ArgumentTypeError("at least one game must be played")
+    return games
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate HEXAGOD games headless")
+    parser.add_argument("--games", type=parse_games, default=10000)
+    parser.add_argument("--policy", default="greedy")
+    parser.add_argument(
+        "--probabilities",
+        type=parse_probabilities,
+        action="append",
+        help="comma separated UNIQUE_BIOME_PROBABILITY, may be repeated",
+    )
+    parser.add_argument(
+        "--tiles", type=int, action="append", help="starting stack, may be repeated"
+    )
+    parser.add_argument("--preview", type=int, default=PREVIEW_LENGTH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the report to this path")
+    args = parser.parse_args()
+
+    configs = [
+        (probabilities, tiles)
+        for probabilities in args.probabilities
+        or [list(tilemanager.UNIQUE_BIOME_PROBABILITY)]
+        for tiles in args.tiles or [STARTING_TILES]
+    ]
+
+    results = [[Counter(), Counter(), 0, 0] for _ in configs]
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        futures = [
+            pool.submit(
+                run_batch,
+                config_index,
+                probabilities,
+                tiles,
+                args.preview,
+                args.policy,
+                args.seed,
+                start,
+                min(BATCH_SIZE, args.games - start),
+            )
+            for config_index, (probabilities, tiles) in enumerate(configs)
+            for start in range(0, args.games, BATCH_SIZE)
+        ]
+        for future in futures:
+            config_index, scores, lengths, placed, perfects = future.result()
+            results[config_index][0].update(scores)
+            results[config_index][1].update(lengths)
+            results[config_index][2] += placed
+            results[config_index][3] += perfects
+    elapsed = time.perf_counter() - start_time
+
+    report = []
+    for (probabilities, tiles), (scores, lengths, placed, perfects) in zip(
+        configs, results
+    ):
+        report.append(
+            {
+                "probabilities": probabilities,
+                "tiles": tiles,
+                "policy": args.policy,
+                "games": args.games,
+                "seed": args.seed,
+                "score": summarise(scores),
+                "length": summarise(lengths),
+                "perfect_rate": round(perfects / max(placed, 1), 4),
+            }
+        )
+
+    for entry in report:
+        print(
+            f"probabilities={entry['probabilities']} tiles={entry['tiles']} "
+            f"policy={entry['policy']} games={entry['games']}"
+        )
+        for name in ("score", "length"):
+            stats = " ".join(f"{k}={v}" for k, v in entry[name].items())
+            print(f"  {name:<7} {stats}")
+        print(f"  perfect tiles per placement {entry['perfect_rate']}")
+
+    total_games = args.games * len(configs)
+    print(f"{total_games} games in {elapsed:.2f}s ({total_games / elapsed:.0f}/s)")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
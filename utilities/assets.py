@@ -0,0 +1,60 @@
+from typing import Any, Callable, Hashable
+import pygame
+
+from utilities.decorators import singleton
+from utilities.spriteloading import slice_sheet
+
+
+# Assets are loaded the first time they are acquired and stay cached while
+# anything still holds a reference, so a restarted scene reuses them as is.
+# Frame sets built from assets are shared through animationplayer.get_frames
+# instead. That cache and ui.render_text keep the fonts they were given alive
+# for the whole process, releasing a font only drops it from this cache
+@singleton
+class AssetManager:
+    def __init__(self) -> None:
+        self.assets = {}  # Key -> [asset, reference count]
+
+    def acquire(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        entry = self.assets.get(key)
+        if entry is None:
+            entry = [load(), 0]
+            self.assets[key] = entry
+        entry[1] += 1
+        return entry[0]
+
+    def release(self, key: Hashable) -> None:
+        entry = self.assets[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self.assets[key]
+
+
+# Everything one owner acquired, so it can all be released together
+class AssetGroup:
+    def __init__(self) -> None:
+        self.keys = []
+
+    def acquire(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        asset = AssetManager().acquire(key, load)
+        self.keys.append(key)
+        return asset
+
+    def sound(self, path: str) -> pygame.mixer.Sound:
+        return self.acquire(("sound", path), lambda: pygame.mixer.Sound(path))
+
+    def font(self, path: str, size: int) -> pygame.font.Font:
+        return self.acquire(("font", path, size), lambda: pygame.font.Font(path, size))
+
+    def sheet(
+        self, path: str, sprite_width: int, sprite_height: int
+    ) -> list[pygame.Surface]:
+        return self.acquire(
+            ("sheet", path, sprite_width, sprite_height),
+            lambda: slice_sheet(path, sprite_width, sprite_height),
+        )
+
+    def release(self) -> None:
+        for key in self.keys:
+            AssetManager().release(key)
+        self.keys.clear()
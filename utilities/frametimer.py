@@ -0,0 +1,176 @@
+import csv
+import json
+import pygame
+
+from utilities.assets import AssetGroup
+from config.settings import FPS
+
+
+FRAME_HISTORY = 600  # Ten seconds at 60 FPS
+PHASES = ("events", "input", "update", "render", "flip")
+# Phases plus bounds on how long input took to reach the screen: from when it
+# was read to the flip showing it, and from the earliest it could have arrived.
+# Both are 0 on frames without input
+LATENCIES = ("latency_min", "latency_max")
+MEASURES = PHASES + LATENCIES
+PERCENTILES = (50, 95, 99)
+
+FRAME_BUDGET = 1 / FPS
+
+GRAPH_FRAMES = 120
+GRAPH_HEIGHT = 60
+GRAPH_SCALE = GRAPH_HEIGHT / (FRAME_BUDGET * 2)  # Pixels per second
+OVERLAY_POSITION = (4, 24)
+SUMMARY_INTERVAL = 30  # Frames between refreshing the percentile text
+
+OVERLAY_BACKGROUND = (0, 0, 0, 160)
+BUDGET_COLOUR = (255, 255, 255)
+TEXT_COLOUR = (255, 255, 255)
+PHASE_COLOURS = {
+    "events": (160, 160, 160),
+    "input": (87, 167, 115),
+    "update": (255, 225, 86),
+    "render": (191, 148, 228),
+    "flip": (255, 140, 60),
+    "latency_min": (255, 110, 110),
+    "latency_max": (255, 110, 110),
+}
+
+
+# Times of each phase of recent frames, kept in ring buffers that are allocated
+# once so recording never allocates. The slot at index is the frame in progress
+class FrameTimer:
+    def __init__(self, length: int = FRAME_HISTORY) -> None:
+        self.length = length
+        self.times = {measure: [0.0] * length for measure in MEASURES}
+        self.index = 0
+        self.frames = 0
+
+        self.visible = False
+        self.assets = None
+        self.summary_surfaces = []
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.times[phase][self.index] += seconds
+
+    def next_frame(self) -> None:
+        self.index = (self.index + 1) % self.length
+        self.frames = min(self.frames + 1, self.length - 1)
+        for times in self.times.values():
+            times[self.index] = 0.0
+
+        if self.visible and self.index % SUMMARY_INTERVAL == 0:
+            self.render_summary()
+
+    def get_last_frame_time(self, phases: tuple[str, ...] = PHASES) -> float:
+        return sum(self.times[phase][self.index - 1] for phase in phases)
+
+    # Recorded times of a phase from oldest to newest
+    def get_times(self, phase: str) -> list[float]:
+        times = self.times[phase]
+        start = self.index - self.frames
+        if start >= 0:
+            return times[start : self.index]
+        return times[start:] + times[: self.index]
+
+    def get_frame_times(self) -> list[float]:
+        return [sum(frame) for frame in zip(*(self.get_times(p) for p in PHASES))]
+
+    def summarise(self) -> dict[str, dict[str, float]]:
+        summary = {phase: self.get_times(phase) for phase in PHASES}
+        summary["frame"] = self.get_frame_times()
+        for name in LATENCIES:
+            summary[name] = [t for t in self.get_times(name) if t > 0]
+        return {
+            name: {
+                f"p{p}": round(percentile(times, p / 100) * 1000, 3)
+                for p in PERCENTILES
+            }
+            for name, times in summary.items()
+        }
+
+    # Text only changes every SUMMARY_INTERVAL frames so it is rendered then
+    def render_summary(self) -> None:
+        self.summary_surfaces = [
+            self.font.render(
+                f"{name:<11} " + " ".join(f"{k}={v:.1f}" for k, v in stats.items()),
+                False,
+                PHASE_COLOURS.get(name, TEXT_COLOUR),
+            )
+            for name, stats in self.summarise().items()
+        ]
+
+    def toggle(self) -> None:
+        self.visible = not self.visible
+        if self.visible:
+            if self.assets is None:
+                self.assets = AssetGroup()
+                self.font = self.assets.font("assets/joystix.ttf", 8)
+                self.overlay = pygame.Surface(
+                    (GRAPH_FRAMES * 2, GRAPH_HEIGHT), pygame.SRCALPHA
+                )
+            self.render_summary()
+
+    def get_rect(self) -> pygame.Rect:
+        width = max([GRAPH_FRAMES * 2] + [s.get_width() for s in self.summary_surfaces])
+        height = GRAPH_HEIGHT + 2 + len(self.summary_surfaces) * 10
+        return pygame.Rect(OVERLAY_POSITION, (width, height))
+
+    def render(self, surface: pygame.Surface) -> None:
+        if not self.visible:
+            return
+
+        x, y = OVERLAY_POSITION
+        overlay = self.overlay
+        overlay.fill(OVERLAY_BACKGROUND)
+
+        # Phases are stacked per frame, newest frame on the right
+        times = [self.get_times(phase)[-GRAPH_FRAMES:] for phase in PHASES]
+        offset = GRAPH_FRAMES - len(times[0])
+        for i, frame in enumerate(zip(*times)):
+            bottom = GRAPH_HEIGHT
+            for phase, seconds in zip(PHASES, frame):
+                height = seconds * GRAPH_SCALE
+                pygame.draw.line(
+                    overlay,
+                    PHASE_COLOURS[phase],
+                    ((offset + i) * 2, bottom),
+                    ((offset + i) * 2, bottom - height),
+                    2,
+                )
+                bottom -= height
+
+        budget_y = GRAPH_HEIGHT - FRAME_BUDGET * GRAPH_SCALE
+        pygame.draw.line(
+            overlay, BUDGET_COLOUR, (0, budget_y), (GRAPH_FRAMES * 2, budget_y)
+        )
+        surface.blit(overlay, (x, y))
+
+        for i, text in enumerate(self.summary_surfaces):
+            surface.blit(text, (x, y + GRAPH_HEIGHT + 2 + i * 10))
+
+    # Writes every recorded frame, as CSV or JSON depending on the extension
+    def export(self, path: str) -> None:
+        rows = zip(*(self.get_times(measure) for measure in MEASURES))
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(MEASURES)
+                writer.writerows(rows)
+        else:
+            with open(path, "w") as file:
+                json.dump(
+                    {
+                        "summary": self.summarise(),
+                        "frames": [dict(zip(MEASURES, row)) for row in rows],
+                    },
+                    file,
+                    indent=2,
+                )
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]